@@ -16,35 +16,54 @@ __source__ = ('https://raw.githubusercontent.com/juancarlospaco/'
 
 
 # imports
+import atexit
 import codecs
+import gzip
+import hashlib
+import hmac
+import html
+import json
 import logging as log
 import os
+import platform
+import shutil
 import signal
+import socket
+import sqlite3
+import struct
 import sys
 import tarfile
+import threading
 import time
 import zipfile
-from copy import copy
-from ctypes import byref, cdll, create_string_buffer
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from ctypes import (CFUNCTYPE, POINTER, Structure, byref, c_char_p, c_int,
+                    c_long, c_ulong, c_void_p, cast, cdll,
+                    create_string_buffer)
 from datetime import datetime
-from getopt import getopt
-from subprocess import call, check_output
-from tempfile import gettempdir
+from functools import partial
+from getopt import GetoptError, getopt
+from getpass import getpass
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from itertools import product
+from logging.handlers import QueueHandler, QueueListener
+from queue import Full, Queue
+from subprocess import PIPE, STDOUT, Popen, TimeoutExpired, call, check_output
+from tempfile import gettempdir, mkdtemp, mkstemp
 from urllib import request
 from webbrowser import open_new_tab
 from zipfile import ZipFile
 
-from PyQt5.QtCore import (QDir, QFile, QFileInfo, QIODevice, QProcess, QSize,
-                          Qt, QTimer, QUrl)
-from PyQt5.QtGui import QIcon
-from PyQt5.QtNetwork import (QNetworkAccessManager, QNetworkProxyFactory,
-                             QNetworkRequest)
-from PyQt5.QtWidgets import (QApplication, QCheckBox, QComboBox, QDialog,
-                             QDialogButtonBox, QFileDialog, QFontDialog,
-                             QGridLayout, QGroupBox, QHBoxLayout, QInputDialog,
-                             QLabel, QMainWindow, QMessageBox, QProgressBar,
-                             QProgressDialog, QShortcut, QSpinBox, QVBoxLayout,
-                             QWidget)
+try:  # Optional,Game containers use AES-GCM when it is installed
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = InvalidTag = None
 
 
 HELP = """<h3>BGElauncher</h3><b>Blender Game Engine Launcher App !</b><br>
@@ -53,6 +72,4135 @@ DEV: <a href=https://github.com/juancarlospaco>JuanCarlos</a>
 """.format(__version__, __license__)
 GAME_FILE = "game.blend"
 PASSWORD = ""
+CHUNK_SIZE = 1024 * 1024  # 1 MegaByte, buffer size for file copy operations
+CACHE_DIR = os.path.join(os.environ.get(
+    "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "bgelauncher")
+CACHE_SIZE = 4 * 1024 * 1024 * 1024  # 4 GigaBytes, max size of extract cache
+MEMORY_LIMIT = 1024 * 1024 * 1024  # 1 GigaByte, max size of In-RAM games
+CONTAINER_EXT = ".bgez"  # Chunked,compressed and encrypted Game container
+CONTAINER_MAGIC = b"BGEZ\x01"  # Chunks with SHAKE256 keystream and HMAC
+CONTAINER_MAGIC_AEAD = b"BGEZ\x02"  # Chunks with AES-256-GCM
+LOG_SIZE = 8 * 1024 * 1024  # 8 MegaBytes, rotate Game logs bigger than this
+LOG_BACKUPS = 3  # Rotated Game logs to keep, game.log.1 to game.log.3
+OUTPUT_LINE_MAX = 64 * 1024  # Characters, a longer line without newline
+OUTPUT_QUEUE_SIZE = 4096  # Chunks of output waiting for the log writer
+TELEMETRY_PREFIX = "BGELAUNCHER-TELEMETRY "  # Prefix of lines from the hook
+MONITOR_INTERVAL = 1.0  # Seconds between samples of the Game CPU,RAM and IO
+BENCH_DURATION = 20.0  # Seconds to run each cell of a --bench sweep
+SUPERVISOR_BACKOFF = (1.0, 60.0)  # Seconds,first and max delay of a restart
+SUPERVISOR_RESTARTS = 5  # Crashes in a row before giving up on an instance
+SUPERVISOR_STABLE = 30.0  # Seconds running that forget the previous crashes
+THROTTLE_IDLE = 60.0  # Seconds without input to throttle a wallpaper Game
+THROTTLE_PERIOD = 0.5  # Seconds,one run and stop cycle of a throttled Game
+THROTTLE_DUTY = {"active": 1.0, "idle": 0.25, "hidden": 0.0}  # Running part
+THROTTLE_BATTERY = 0.5  # Factor of the running part when on battery
+TUNE_LEVELS = (  # Settings tried by --tune,each from lower to higher quality
+    ("resolution", ["640x480", "800x600", "1024x768", "1280x720",
+                    "1680x1050", "1920x1080"]),
+    ("samples", [2, 4, 8, 16]), ("blender_material", [True, False]),
+    ("no_mipmaps", [True, False]))
+DOWNLOAD_SEGMENTS = (2, 6)  # Min,max connections,Qt opens 6 per host at most
+SEGMENT_MIN_SIZE = 4 * 1024 * 1024  # 4 MegaBytes, smaller are not split
+SEGMENT_RETRIES = 3  # Times a failed segment is retried before giving up
+DELTA_BLOCK_SIZE = 256 * 1024  # 256 KiloBytes, block size of Game manifests
+DELTA_MAX_GAP = 1  # Blocks,ranges closer than this are merged on one request
+MANIFEST_EXT = ".manifest.json"  # Published next to the Game for updates
+RESIDENT_SOCKET = os.path.join(os.environ.get("XDG_RUNTIME_DIR") or CACHE_DIR,
+                               "bgelauncher.sock")  # Of the --resident mode
+BENCH_MATRIX = {  # Settings swept by --bench,override with --matrix JSON
+    "samples": [2, 4, 8, 16],
+    "resolution": ["640x480", "1280x720", "1920x1080"],
+    "no_mipmaps": [False, True], "blender_material": [False, True]}
+LOG_FILE = os.path.join(gettempdir(), "bge-launcher.log")
+LOG_COLORS = ((40, "\x1b[31m"), (30, "\x1b[33m"), (20, "\x1b[32m"),
+              (10, "\x1b[35m"))  # Red,yellow,green and pink,from level
+
+
+###############################################################################
+
+
+class ColorFormatter(log.Formatter):
+
+    """Formatter with ANSI colors by level,records are not modified.
+
+    >>> record = log.makeLogRecord({"msg": "Hi %s", "args": ("you", ),
+    ...                             "levelno": 30, "levelname": "WARNING"})
+    >>> ColorFormatter("%(levelname)s: %(message)s").format(record)
+    '\\x1b[33mWARNING: Hi you\\x1b[0m'
+    >>> record.msg
+    'Hi %s'
+    """
+
+    def format(self, record):
+        """Return the formatted record,colored by level."""
+        text = log.Formatter.format(self, record)
+        for level, color in LOG_COLORS:
+            if record.levelno >= level:
+                return color + text + "\x1b[0m"
+        return text
+
+
+class JsonFormatter(log.Formatter):
+
+    """Formatter of JSON lines,one JSON object per record.
+
+    >>> record = log.makeLogRecord({"msg": "Hi %s", "args": ("you", ),
+    ...                             "name": "bgelauncher", "created": 1.5,
+    ...                             "levelname": "INFO"})
+    >>> JsonFormatter().format(record)
+    '{"level": "INFO", "logger": "bgelauncher", "message": "Hi you", \
+"thread": "MainThread", "time": 1.5}'
+    """
+
+    def format(self, record):
+        """Return the record as a JSON line."""
+        entry = {"time": record.created, "level": record.levelname,
+                 "logger": record.name, "message": record.getMessage(),
+                 "thread": record.threadName}
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, sort_keys=True)
+
+
+class _QueueHandler(QueueHandler):
+
+    """Queue handler that does not copy nor format the records."""
+
+    def prepare(self, record):
+        """Merge the arguments into the message,before they change."""
+        record.msg, record.args = record.getMessage(), None
+        return record
+
+
+def setup_logging(level=log.DEBUG, log_file=LOG_FILE, json_lines=False,
+                  color=None, stream=sys.stderr, logger=None, threaded=True):
+    """
+    Log to a queue,written to file and stream by a thread,return it.
+
+    Only putting the record on the queue happens on the caller thread,
+    formatting and writing happen on the thread of the QueueListener.
+    Not threaded writes on the caller thread,for processes that exec.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> logger = log.getLogger("bgelauncher.test")
+    >>> logger.propagate = False
+    >>> listener = setup_logging(log.INFO, os.path.join(temp_dir, "t.log"),
+    ...                          json_lines=True, stream=None,
+    ...                          logger=logger)
+    >>> logger.debug("Not logged"), logger.info("Hi %s", "you")
+    (None, None)
+    >>> listener.stop()
+    >>> with open(os.path.join(temp_dir, "t.log")) as log_file:
+    ...     [json.loads(line)["message"] for line in log_file]
+    ['Hi you']
+    >>> shutil.rmtree(temp_dir)
+    """
+    logger = logger or log.getLogger()
+    if color is None:
+        color = not sys.platform.startswith("win") and bool(
+            stream and stream.isatty())
+    handlers = []
+    if log_file:
+        handlers.append(log.FileHandler(log_file, "w", encoding="utf-8"))
+        handlers[-1].setFormatter(JsonFormatter() if json_lines else (
+            log.Formatter("%(levelname)s:%(asctime)s %(message)s")))
+    if stream is not None:
+        handlers.append(log.StreamHandler(stream))
+        handlers[-1].setFormatter(
+            JsonFormatter() if json_lines and not log_file else
+            (ColorFormatter if color else log.Formatter)(
+                "%(levelname)s: %(message)s"))
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(level)
+    if not threaded:
+        for handler in handlers:
+            logger.addHandler(handler)
+        return None
+    queue = Queue()
+    logger.addHandler(_QueueHandler(queue))
+    listener = QueueListener(queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def benchmark_logging(records=20000):
+    """
+    Benchmark the cost of a log call on the caller thread,sync and queue.
+
+    Sync is how main() used to log,a file handler and a stream handler
+    that copied every record to color it,both writing on the caller thread.
+
+    >>> sorted(benchmark_logging(100))
+    ['queue', 'sync']
+    """
+
+    class CopyColorHandler(log.StreamHandler):
+
+        def emit(self, record):
+            record = log.makeLogRecord(record.__dict__)
+            record.msg = "\x1b[32m" + str(record.msg) + "\x1b[0m"
+            return log.StreamHandler.emit(self, record)
+
+    temp_dir, results = mkdtemp(prefix="bgelauncher-"), {}
+    logger = log.getLogger("bgelauncher.benchmark")
+    logger.propagate = False
+    try:
+        with open(os.path.join(temp_dir, "terminal"), "w") as terminal:
+            handler = log.FileHandler(os.path.join(temp_dir, "sync.log"))
+            handler.setFormatter(log.Formatter(
+                "%(levelname)s:%(asctime)s %(message)s"))
+            logger.handlers[:] = [handler, CopyColorHandler(terminal)]
+            logger.setLevel(log.DEBUG)
+            started = time.perf_counter()
+            for number in range(records):
+                logger.debug("Line %d of the Game output", number)
+            results["sync"] = (time.perf_counter() - started) / records
+            handler.close()
+            listener = setup_logging(log.DEBUG, os.path.join(
+                temp_dir, "queue.log"), color=True, stream=terminal,
+                logger=logger)
+            started = time.perf_counter()
+            for number in range(records):
+                logger.debug("Line %d of the Game output", number)
+            results["queue"] = (time.perf_counter() - started) / records
+            listener.stop()
+        log.info("Logging benchmark,Seconds per call: {}".format(results))
+        return results
+    finally:
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            handler.close()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+class _Span(object):
+
+    """Span of an enabled Tracer,a context manager."""
+
+    __slots__ = ("tracer", "name", "args", "started")
+
+    def __init__(self, tracer, name, args):
+        """Init class."""
+        self.tracer, self.name, self.args = tracer, name, args
+
+    def __enter__(self):
+        """Start the span."""
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Finish the span,add it to the Tracer."""
+        self.tracer.add(self.name, self.started, args=self.args)
+
+
+class _NullSpan(object):
+
+    """Span of a disabled Tracer,does nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        """Do nothing."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Do nothing."""
+
+
+class Tracer(object):
+
+    """Named spans of the launcher phases,saved as a Chrome trace JSON.
+
+    Open the trace on ui.perfetto.dev or chrome://tracing,disabled it
+    costs a method call and an attribute check per span.
+
+    >>> tracer = Tracer(enabled=True)
+    >>> with tracer.span("outer"):
+    ...     with tracer.span("inner", {"game": "game.blend"}):
+    ...         pass
+    >>> tracer.add("callback", time.perf_counter() - 0.5)
+    >>> [event["name"] for event in tracer.events]
+    ['inner', 'outer', 'callback']
+    >>> tracer.summary()["callback"]["total"] >= 0.5
+    True
+    >>> print(tracer.format_summary().splitlines()[0])
+    Span                          Count   Total ms     Max ms
+    >>> with Tracer().span("disabled"):
+    ...     pass
+    """
+
+    def __init__(self, enabled=False):
+        """Init class."""
+        self.enabled, self.events, self.trace_file = enabled, [], None
+        self._null = _NullSpan()
+
+    def start(self, trace_file):
+        """Enable,save the trace and print the summary on exit."""
+        self.enabled, self.trace_file = True, trace_file
+        self.add("python startup", time.perf_counter() - get_process_uptime())
+        atexit.register(self.save)
+
+    def span(self, name, args=None):
+        """Return a context manager that traces a span."""
+        return _Span(self, name, args) if self.enabled else self._null
+
+    def add(self, name, started, finished=None, args=None):
+        """Add a span from perf_counter seconds,for spans across events."""
+        if not self.enabled or started is None:
+            return
+        finished = time.perf_counter() if finished is None else finished
+        self.events.append({  # Appending to a list is thread safe
+            "name": name, "cat": "bgelauncher", "ph": "X",
+            "ts": started * 1000000.0,
+            "dur": max(finished - started, 0.0) * 1000000.0,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": args or {}})
+
+    def summary(self):
+        """Return count,total and max Seconds of each span name."""
+        summary = {}
+        for event in self.events:
+            entry = summary.setdefault(event["name"], {
+                "count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += event["dur"] / 1000000.0
+            entry["max"] = max(entry["max"], event["dur"] / 1000000.0)
+        return summary
+
+    def format_summary(self):
+        """Return the summary as a text table,slowest first."""
+        lines = ["{:<28} {:>6} {:>10} {:>10}".format(
+            "Span", "Count", "Total ms", "Max ms")]
+        for name, entry in sorted(self.summary().items(),
+                                  key=lambda item: -item[1]["total"]):
+            lines.append("{:<28} {:>6} {:>10.3f} {:>10.3f}".format(
+                name[:28], entry["count"], entry["total"] * 1000.0,
+                entry["max"] * 1000.0))
+        return "\n".join(lines)
+
+    def save(self):
+        """Write the trace and print the summary,once,return the file."""
+        trace_file, self.trace_file = self.trace_file, None
+        if not self.enabled or not trace_file:
+            return None
+        with open(trace_file, "w") as trace:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"},
+                      trace)
+        print(self.format_summary(), file=sys.stderr)  # Logging is stopped
+        print("Trace written to " + trace_file, file=sys.stderr)
+        return trace_file
+
+
+TRACER = Tracer()  # Enabled by --trace
+
+
+def get_trace_file(argv):
+    """
+    Return the file of the --trace option of the command line,or None.
+
+    >>> get_trace_file(["bgelauncher", "--trace", "t.json", "-d"])
+    't.json'
+    >>> get_trace_file(["bgelauncher", "--trace=t.json"])
+    't.json'
+    >>> get_trace_file(["bgelauncher", "--trace"]) is None
+    True
+    """
+    for index, arg in enumerate(argv):
+        if arg == "--trace" and index + 1 < len(argv):
+            return argv[index + 1]
+        if arg.startswith("--trace="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+def benchmark_tracer(spans=100000):
+    """
+    Benchmark the cost of a span,Seconds per span,disabled and enabled.
+
+    >>> sorted(benchmark_tracer(100))
+    ['disabled', 'enabled']
+    """
+    results = {}
+    for name, tracer in (("disabled", Tracer()), ("enabled", Tracer(True))):
+        started = time.perf_counter()
+        for _ in range(spans):
+            with tracer.span("benchmark"):
+                pass
+        results[name] = (time.perf_counter() - started) / spans
+    log.info("Tracer benchmark,Seconds per span: {}".format(results))
+    return results
+
+
+###############################################################################
+
+
+def parse_blender_version(output):
+    """
+    Parse the output of blender --version into a lowercase version string.
+
+    >>> parse_blender_version(b"Blender 2.79 (sub 0)\\n\\tbuild date: 2017")
+    'blender 2.79'
+    """
+    if isinstance(output, bytes):
+        output = output.decode("utf-8", "replace")
+    return output.strip().splitlines()[0].split(" (")[0].strip().lower()
+
+
+def _blender_version_key(blender):
+    """Return the cache key of a Blender binary: real path,size and mtime."""
+    path = os.path.realpath(shutil.which(blender) or blender)
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def load_cached_blender_version(blender="blender"):
+    """Return the cached version of a Blender binary or None if unknown."""
+    try:
+        key = _blender_version_key(blender)
+        with open(os.path.join(CACHE_DIR, "versions.json"), "r") as cache:
+            cached = json.load(cache).get(key[0])
+        if cached and cached[:2] == key[1:]:
+            return cached[2]
+    except (OSError, ValueError) as reason:
+        log.debug(reason)
+
+
+def save_cached_blender_version(version, blender="blender"):
+    """Save the version of a Blender binary on the cache."""
+    try:
+        key, cache_file = _blender_version_key(blender), os.path.join(
+            CACHE_DIR, "versions.json")
+        try:
+            with open(cache_file, "r") as cache:
+                versions = json.load(cache)
+        except (OSError, ValueError):
+            versions = {}
+        versions[key[0]] = key[1:] + [version]
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temp = cache_file + ".{}.tmp".format(os.getpid())
+        with open(temp, "w") as cache:
+            json.dump(versions, cache)
+        os.replace(temp, cache_file)
+    except OSError as reason:
+        log.debug(reason)
+
+
+def benchmark_version_probe():
+    """
+    Benchmark the Blender version probe,spawning Blender against the cache.
+
+    >>> sorted(benchmark_version_probe())
+    ['cached', 'spawn']
+    """
+    results = {}
+    started = time.perf_counter()
+    try:
+        parse_blender_version(check_output(("blender", "--version")))
+    except Exception as reason:
+        log.debug(reason)
+    results["spawn"] = time.perf_counter() - started
+    started = time.perf_counter()
+    load_cached_blender_version()
+    results["cached"] = time.perf_counter() - started
+    log.info("Version probe benchmark: {}".format(results))
+    return results
+
+
+###############################################################################
+
+
+def _safe_join(destination, member_name):
+    """
+    Join a ZIP member name to destination, refusing to escape from it.
+
+    >>> _safe_join("game", "data/level.blend").replace(os.sep, "/")
+    'game/data/level.blend'
+    >>> _safe_join("game", "../../etc/passwd")
+    Traceback (most recent call last):
+    ...
+    ValueError: Unsafe ZIP member name: ../../etc/passwd
+    """
+    target = os.path.normpath(os.path.join(destination, member_name))
+    root = os.path.normpath(destination)
+    if os.path.isabs(member_name) or not (
+            target == root or target.startswith(root + os.sep)):
+        raise ValueError("Unsafe ZIP member name: {}".format(member_name))
+    return target
+
+
+def _extract_members(game_file, password, names, destination):
+    """Extract and CRC check ZIP members on a single pass,for a Pool worker."""
+    extracted = 0
+    with ZipFile(game_file, "r") as zipy:
+        zipy.setpassword(password)
+        for name in names:
+            target = _safe_join(destination, name)
+            if name.endswith("/"):
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp = target + ".part"
+            try:  # ZipExtFile raises BadZipFile on CRC mismatch at the EOF
+                with zipy.open(name) as source, open(temp, "wb") as output:
+                    shutil.copyfileobj(source, output, CHUNK_SIZE)
+                os.replace(temp, target)
+            except BaseException:
+                if os.path.isfile(temp):
+                    os.remove(temp)
+                raise
+            extracted += zipy.getinfo(name).file_size
+    return extracted
+
+
+def extract_game_archive(game_file, password=None, destination=os.curdir,
+                         workers=None, progress=None):
+    """
+    Extract a ZIP verifying CRCs while extracting, across multiple cores.
+
+    Members are balanced by compressed size on buckets for a Process Pool,
+    progress(done_bytes, total_bytes) is called often while waiting,
+    so a GUI can keep processing events, returns list of extracted names.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ZipFile(game_file, "r") as zipy:
+        infos = zipy.infolist()
+    total = sum(info.file_size for info in infos) or 1
+    buckets = [[] for _ in range(min(workers * 4, len(infos)) or 1)]
+    loads = [0] * len(buckets)
+    for info in sorted(infos, key=lambda i: i.compress_size, reverse=True):
+        lightest = loads.index(min(loads))
+        buckets[lightest].append(info.filename)
+        loads[lightest] += info.compress_size + 1
+    buckets = [bucket for bucket in buckets if bucket]
+    log.debug("Extracting {} members of {} with {} workers.".format(
+        len(infos), game_file, workers))
+    if workers < 2 or len(buckets) < 2:
+        for bucket in buckets:
+            _extract_members(game_file, password, bucket, destination)
+        if progress:
+            progress(total, total)
+        return [info.filename for info in infos]
+    done = 0
+    with ProcessPoolExecutor(min(workers, len(buckets))) as pool:
+        pending = {pool.submit(_extract_members, game_file, password, bucket,
+                               destination) for bucket in buckets}
+        while pending:
+            finished, pending = wait(pending, 0.05, FIRST_COMPLETED)
+            done += sum(future.result() for future in finished)
+            if progress:
+                progress(done, total)
+    return [info.filename for info in infos]
+
+
+def benchmark_extraction(members=8, size=1024 * 1024):
+    """
+    Benchmark testzip() + extractall() against extract_game_archive().
+
+    Uses a synthetic archive, returns a dict with seconds of each path.
+
+    >>> sorted(benchmark_extraction(members=4, size=4096))
+    ['engine', 'testzip_extractall']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        archive = os.path.join(temp_dir, "game.zip")
+        with ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipy:
+            for index in range(members):
+                zipy.writestr("data/{}.blend".format(index),
+                              os.urandom(size // 2) + bytes(size // 2))
+        results = {}
+        started = time.perf_counter()
+        with ZipFile(archive, "r") as zipy:
+            if zipy.testzip() is None:
+                zipy.extractall(os.path.join(temp_dir, "old"))
+        results["testzip_extractall"] = time.perf_counter() - started
+        started = time.perf_counter()
+        extract_game_archive(archive, None, os.path.join(temp_dir, "new"))
+        results["engine"] = time.perf_counter() - started
+        log.info("Extraction benchmark: {}".format(results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def get_available_memory():
+    """
+    Return available RAM in bytes from /proc/meminfo, or None if unknown.
+
+    >>> get_available_memory() is None or get_available_memory() > 0
+    True
+    """
+    try:
+        with open("/proc/meminfo", "r") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError) as reason:
+        log.debug(reason)
+
+
+class MemoryFile(object):
+
+    """Memory backed file for a Game,a memfd or a tmpfs file,never the disk.
+
+    >>> memory_file = MemoryFile("game.blend")
+    >>> _ = memory_file.write(b"BLENDER")
+    >>> open(memory_file.path, "rb").read()
+    b'BLENDER'
+    >>> memory_file.close()
+    """
+
+    def __init__(self, name):
+        """Init class."""
+        self._fd, self._temp = None, None
+        if hasattr(os, "memfd_create"):  # Linux, fd is inherited by children
+            self._fd = os.memfd_create(name, 0)
+            self.path = "/proc/{}/fd/{}".format(os.getpid(), self._fd)
+        elif os.path.isdir("/dev/shm"):  # tmpfs
+            self._fd, self._temp = mkstemp(suffix="-" + name, dir="/dev/shm")
+            self.path = self._temp
+        else:
+            raise OSError("No memory backed file system available.")
+
+    def write(self, data):
+        """Write bytes at the end of the file."""
+        return os.write(self._fd, data)
+
+    def close(self):
+        """Close and release the memory."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._temp and os.path.isfile(self._temp):
+            os.remove(self._temp)
+
+
+def extract_to_memory(game_file, password, member, limit=MEMORY_LIMIT):
+    """
+    Decrypt a ZIP member into a MemoryFile,return None if it can not fit.
+
+    The payload must be smaller than limit and than the available RAM,
+    caller should fallback to extraction to disk when None is returned.
+    """
+    with ZipFile(game_file, "r") as zipy:
+        zipy.setpassword(password)
+        size = zipy.getinfo(member).file_size
+        available = get_available_memory()
+        if size > limit or (available is not None and size > available):
+            log.info("Game too big for RAM: {} Bytes.".format(size))
+            return None
+        try:
+            memory_file = MemoryFile(os.path.basename(member))
+        except OSError as reason:
+            log.warning(reason)
+            return None
+        try:
+            with zipy.open(member) as source:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    memory_file.write(chunk)
+        except BaseException:
+            memory_file.close()
+            raise
+    return memory_file
+
+
+def benchmark_diskless(size=64 * 1024 * 1024):
+    """
+    Benchmark time to launch extraction to disk against to memory.
+
+    Extraction to disk goes to BGELAUNCHER_BENCH_DIR, so it can be pointed
+    to a Spinning Disk or a SD Card, returns a dict with seconds of each.
+
+    >>> sorted(benchmark_diskless(4096))
+    ['disk', 'memory']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-",
+                       dir=os.environ.get("BGELAUNCHER_BENCH_DIR"))
+    try:
+        archive = os.path.join(temp_dir, "game.zip")
+        with ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipy:
+            zipy.writestr("game.blend",
+                          os.urandom(size // 2) + bytes(size // 2))
+        results = {}
+        started = time.perf_counter()
+        extract_game_archive(archive, None, os.path.join(temp_dir, "disk"))
+        if hasattr(os, "sync"):
+            os.sync()  # Include the cost of writing to persistent storage
+        results["disk"] = time.perf_counter() - started
+        started = time.perf_counter()
+        memory_file = extract_to_memory(archive, None, "game.blend")
+        results["memory"] = time.perf_counter() - started
+        if memory_file:
+            memory_file.close()
+        log.info("Diskless benchmark: {}".format(results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+def _container_keys(password, salt, aead=False):
+    """Derive the encryption key and the authentication key from password."""
+    keys = hashlib.pbkdf2_hmac("sha256", password or b"", salt, 100000, 64)
+    return keys[:32], keys[32:], aead
+
+
+def _xor_keystream(key, index, data):
+    """Encrypt or decrypt data with the SHAKE256 keystream of a chunk."""
+    stream = hashlib.shake_256(key + struct.pack("<Q", index)).digest(
+        len(data))
+    return (int.from_bytes(data, "little") ^ int.from_bytes(
+        stream, "little")).to_bytes(len(data), "little")
+
+
+def _seal_chunk(keys, index, raw):
+    """Compress, encrypt and authenticate a chunk, for a Pool worker."""
+    if keys[2]:  # The nonce is unique,every container has its own salt
+        return AESGCM(keys[0]).encrypt(struct.pack("<Q4x", index),
+                                       zlib.compress(raw, 6), None)
+    data = _xor_keystream(keys[0], index, zlib.compress(raw, 6))
+    tag = hmac.new(keys[1], struct.pack("<Q", index) + data, "sha256")
+    return data + tag.digest()
+
+
+def _open_chunk(container, keys, index, offset, length, destination, at):
+    """Verify,decrypt,decompress a chunk and write it at its final offset."""
+    with open(container, "rb") as source:
+        source.seek(offset)
+        stored = source.read(length)
+    if keys[2]:
+        try:
+            raw = zlib.decompress(AESGCM(keys[0]).decrypt(
+                struct.pack("<Q4x", index), stored, None))
+        except InvalidTag:
+            raise ValueError("Corrupt chunk {} on {}.".format(
+                index, container))
+    else:
+        data, tag = stored[:-32], stored[-32:]
+        expected = hmac.new(keys[1], struct.pack("<Q", index) + data,
+                            "sha256")
+        if not hmac.compare_digest(tag, expected.digest()):
+            raise ValueError("Corrupt chunk {} on {}.".format(
+                index, container))
+        raw = zlib.decompress(_xor_keystream(keys[0], index, data))
+    fd = os.open(destination, os.O_WRONLY)
+    try:
+        os.pwrite(fd, raw, at)
+    finally:
+        os.close(fd)
+    return len(raw)
+
+
+def pack_game_container(game_file, destination=None, password=b"",
+                        chunk_size=4 * CHUNK_SIZE, workers=None, aead=None):
+    """
+    Pack a .blend into a chunked,compressed and encrypted Game container.
+
+    Layout: magic, salt, chunk count, raw size, an index of (offset, stored
+    length, raw length) per chunk and a HMAC of all that, then the chunks,
+    each one encrypted and authenticated on its own so they can be opened
+    in parallel,in any order. Chunks are sealed on a Process Pool.
+    Chunks use AES-256-GCM if the cryptography package is installed,
+    else a SHAKE256 keystream and HMAC-SHA256 (Encrypt-then-MAC).
+    """
+    destination = destination or os.path.splitext(game_file)[0] + (
+        CONTAINER_EXT)
+    aead = AESGCM is not None if aead is None else aead
+    salt, raw_size = os.urandom(16), os.path.getsize(game_file)
+    keys = _container_keys(password, salt, aead)
+    count = max(1, -(-raw_size // chunk_size))
+    header_size = len(CONTAINER_MAGIC) + 28 + 16 * count + 32
+    index, temp = [], destination + ".part"
+    batch_size = (workers or os.cpu_count() or 1) * 2
+    with open(game_file, "rb") as source, open(temp, "wb") as output, \
+            ProcessPoolExecutor(workers) as pool:
+        output.seek(header_size)
+        for first in range(0, count, batch_size):
+            batch = range(first, min(count, first + batch_size))
+            raws = [source.read(chunk_size) for _ in batch]
+            for raw, stored in zip(raws, pool.map(_seal_chunk, [keys] * len(
+                    raws), batch, raws)):
+                index.append((output.tell(), len(stored), len(raw)))
+                output.write(stored)
+        header = (CONTAINER_MAGIC_AEAD if aead else CONTAINER_MAGIC) + (
+            struct.pack("<16sIQ", salt, count, raw_size)) + b"".join(
+                struct.pack("<QII", *entry) for entry in index)
+        output.seek(0)
+        output.write(header + hmac.new(keys[1], header, "sha256").digest())
+    os.replace(temp, destination)
+    log.info("Packed {} into {}.".format(game_file, destination))
+    return destination
+
+
+def read_container_index(container, password=b""):
+    """Return (keys, raw size, index) of a Game container, verifying it."""
+    with open(container, "rb") as source:
+        header = source.read(len(CONTAINER_MAGIC) + 28)
+        aead = header.startswith(CONTAINER_MAGIC_AEAD)
+        if not aead and not header.startswith(CONTAINER_MAGIC):
+            raise ValueError("Not a Game container: {}".format(container))
+        if aead and AESGCM is None:
+            raise ValueError("Install cryptography to open: {}".format(
+                container))
+        salt, count, raw_size = struct.unpack(
+            "<16sIQ", header[len(CONTAINER_MAGIC):])
+        header += source.read(16 * count)
+        tag = source.read(32)
+    keys = _container_keys(password, salt, aead)
+    if not hmac.compare_digest(tag, hmac.new(keys[1], header,
+                                             "sha256").digest()):
+        raise ValueError("Wrong SerialKey or corrupt: {}".format(container))
+    index = [struct.unpack_from("<QII", header, len(CONTAINER_MAGIC) + 28 +
+                                16 * number) for number in range(count)]
+    return keys, raw_size, index
+
+
+def extract_game_container(container, password=b"", destination=None,
+                           workers=None, progress=None):
+    """
+    Open a Game container into destination, chunks in parallel.
+
+    Chunks are written directly to their offsets as soon as they are ready,
+    progress(done_bytes, total_bytes) is called often while waiting.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> blend = os.path.join(temp_dir, "game.blend")
+    >>> with open(blend, "wb") as blend_file:
+    ...     _ = blend_file.write(b"BLENDER-v279" * 9999)
+    >>> container = pack_game_container(blend, None, b"key", 4096, 2)
+    >>> output = extract_game_container(container, b"key", blend + ".2")
+    >>> open(output, "rb").read() == open(blend, "rb").read()
+    True
+    >>> extract_game_container(container, b"bad", blend + ".3")
+    ... # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: Wrong SerialKey or corrupt: ...
+    >>> container = pack_game_container(blend, None, b"key", 4096, 2, False)
+    >>> output = extract_game_container(container, b"key", blend + ".4")
+    >>> open(output, "rb").read() == open(blend, "rb").read()
+    True
+    >>> with open(container, "r+b") as tampered:
+    ...     _ = tampered.seek(-64, os.SEEK_END)
+    ...     _ = tampered.write(b"X")
+    >>> extract_game_container(container, b"key", blend + ".5", 1)
+    ... # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: Corrupt chunk ...
+    >>> shutil.rmtree(temp_dir)
+    """
+    destination = destination or os.path.splitext(container)[0] + ".blend"
+    keys, raw_size, index = read_container_index(container, password)
+    with open(destination, "ab") as output:  # Preallocate, keep memfds
+        output.truncate(raw_size)
+    at, done, pending = 0, 0, set()
+    if (workers or os.cpu_count() or 1) < 2 or len(index) < 2:
+        for number, (offset, length, raw_length) in enumerate(index):
+            done += _open_chunk(container, keys, number, offset, length,
+                                destination, at)
+            at += raw_length
+            if progress:
+                progress(done, raw_size or 1)
+        return destination
+    with ProcessPoolExecutor(workers) as pool:
+        for number, (offset, length, raw_length) in enumerate(index):
+            pending.add(pool.submit(_open_chunk, container, keys, number,
+                                    offset, length, destination, at))
+            at += raw_length
+        while pending:
+            finished, pending = wait(pending, 0.05, FIRST_COMPLETED)
+            done += sum(future.result() for future in finished)
+            if progress:
+                progress(done, raw_size or 1)
+    return destination
+
+
+def benchmark_container(size=64 * 1024 * 1024):
+    """
+    Benchmark throughput of opening a Game container against a ZIP.
+
+    Returns a dict with MegaBytes per Second of each format.
+
+    >>> sorted(benchmark_container(4096))
+    ['container', 'zip']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        blend = os.path.join(temp_dir, "game.blend")
+        with open(blend, "wb") as blend_file:
+            blend_file.write(os.urandom(size // 2) + bytes(size // 2))
+        archive = os.path.join(temp_dir, "game.zip")
+        with ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipy:
+            zipy.write(blend, "game.blend")
+        container = pack_game_container(blend, password=b"key")
+        results, megabytes = {}, size / 1024 / 1024
+        started = time.perf_counter()
+        with ZipFile(archive, "r") as zipy:
+            if zipy.testzip() is None:
+                zipy.extractall(os.path.join(temp_dir, "zip"))
+        results["zip"] = megabytes / (time.perf_counter() - started)
+        started = time.perf_counter()
+        extract_game_container(container, b"key", blend + ".out")
+        results["container"] = megabytes / (time.perf_counter() - started)
+        log.info("Container benchmark MegaBytes/Second: {}".format(results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+def find_game_blend(names, game_file):
+    """
+    Find the .blend of a Game on the names of a ZIP,prefer same basename.
+
+    >>> find_game_blend(["lib/a.blend", "b/game.blend", "x.txt"], "game.zip")
+    'b/game.blend'
+    >>> find_game_blend(["x.txt"], "game.zip")
+    """
+    blends = [name for name in names if name.lower().endswith(".blend")]
+    wanted = os.path.splitext(os.path.basename(game_file))[0].lower()
+    blends.sort(key=lambda name: os.path.basename(name).lower() != (
+        wanted + ".blend"))
+    if blends:
+        return blends[0]
+
+
+class ExtractionCache(object):
+
+    """Content addressed cache of extracted Game archives with LRU eviction.
+
+    Entries are keyed by the SHA256 of the archive content,the password and
+    a salt that tells apart entries derived differently from the same file,
+    the content hash is only recomputed when the archive size or mtime change,
+    on a worker thread calling progress(done_bytes, total_bytes) meanwhile.
+    Entries are populated on a temporary folder and renamed when complete,
+    a crash mid extraction can not leave a corrupt entry, only a leftover.
+
+    >>> cache = ExtractionCache(mkdtemp(prefix="bgelauncher-"))
+    >>> cache.lookup(__file__, "secret") is None
+    True
+    >>> entry = cache.populate(__file__, "secret", lambda temp_dir: (
+    ...     shutil.copy(__file__, os.path.join(temp_dir, "game.blend"))))
+    >>> cache.lookup(__file__, "secret") == entry
+    True
+    >>> cache.lookup(__file__, "wrong") is None
+    True
+    >>> str(cache).split(",")[:2]
+    [' Cache: 1 Hits', ' 2 Misses']
+    >>> cache.max_size = 0
+    >>> cache.evict(), os.path.isdir(entry), cache.index["hashes"]
+    (0, False, {})
+    >>> shutil.rmtree(cache.directory)
+    """
+
+    def __init__(self, directory=None, max_size=CACHE_SIZE):
+        """Init class."""
+        self.directory = directory or os.path.join(CACHE_DIR, "extracted")
+        self.max_size, self.index = max_size, {"hashes": {}, "costs": {},
+                                               "sources": {}, "hits": 0,
+                                               "misses": 0,
+                                               "saved_seconds": 0.0}
+        self._index_file = os.path.join(self.directory, "index.json")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._index_file, "r") as index_file:
+                self.index.update(json.load(index_file))
+        except (OSError, ValueError) as reason:
+            log.debug(reason)
+        for name in os.listdir(self.directory):  # Leftovers of a crash
+            if name.startswith(".tmp-") and self._age(name) > 86400:
+                shutil.rmtree(os.path.join(self.directory, name), True)
+
+    def __str__(self):
+        """Human readable cache hit and miss statistics."""
+        return " Cache: {} Hits, {} Misses, {:.2f} Seconds saved ".format(
+            self.index["hits"], self.index["misses"],
+            self.index["saved_seconds"])
+
+    def _age(self, name):
+        """Return seconds since the last use of a cache entry."""
+        path = os.path.join(self.directory, name)
+        return time.time() - os.stat(path).st_mtime
+
+    def save(self):
+        """Save the index atomically."""
+        temp = self._index_file + ".{}.tmp".format(os.getpid())
+        with open(temp, "w") as index_file:
+            json.dump(self.index, index_file)
+        os.replace(temp, self._index_file)
+
+    def content_hash(self, game_file, progress=None):
+        """Return SHA256 of a file,re-hash only if size or mtime changed."""
+        stat = os.stat(game_file)
+        path = os.path.abspath(game_file)
+        known = self.index["hashes"].get(path)
+        if known and known[:2] == [stat.st_size, stat.st_mtime_ns]:
+            return known[2]
+        total, position = stat.st_size or 1, [0]
+
+        def hash_file():
+            digest = hashlib.sha256()
+            with open(game_file, "rb") as file_to_hash:
+                for chunk in iter(lambda: file_to_hash.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                    position[0] += len(chunk)
+            return digest.hexdigest()
+
+        with ThreadPoolExecutor(1) as pool:
+            future = pool.submit(hash_file)
+            while not wait([future], 0.05)[0]:
+                if progress:
+                    progress(min(position[0], total), total)
+            hexdigest = future.result()
+        self.index["hashes"][path] = [
+            stat.st_size, stat.st_mtime_ns, hexdigest]
+        return hexdigest
+
+    def key(self, game_file, password="", progress=None, salt=""):
+        """Return the cache key for a file,password and salt."""
+        return hashlib.sha256("{}:{}{}".format(
+            self.content_hash(game_file, progress), password,
+            ":" + salt if salt else "").encode()).hexdigest()
+
+    def lookup(self, game_file, password="", progress=None, salt=""):
+        """Return the entry folder on cache hit, None on cache miss."""
+        key = self.key(game_file, password, progress, salt)
+        entry = os.path.join(self.directory, key)
+        if os.path.isdir(entry):
+            os.utime(entry)  # Mark as recently used for the LRU
+            self.index["hits"] += 1
+            self.index["saved_seconds"] += self.index["costs"].get(key, 0.0)
+            log.info("Cache Hit for {} on {}.".format(game_file, entry))
+        else:
+            entry = None
+            self.index["misses"] += 1
+            log.info("Cache Miss for {}.".format(game_file))
+        self.save()
+        return entry
+
+    def populate(self, game_file, password, extract, salt=""):
+        """Call extract(temp_folder) and atomically add it as a new entry."""
+        key = self.key(game_file, password, salt=salt)
+        entry = os.path.join(self.directory, key)
+        temp_dir = mkdtemp(prefix=".tmp-", dir=self.directory)
+        started = time.perf_counter()
+        try:
+            extract(temp_dir)
+            os.rename(temp_dir, entry)
+        except OSError:
+            if not os.path.isdir(entry):
+                raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        self.index["costs"][key] = time.perf_counter() - started
+        self.index["sources"][key] = os.path.abspath(game_file)
+        self.evict(keep=key)
+        self.save()
+        return entry
+
+    def list_entry(self, entry):
+        """Return the relative file names inside of an entry."""
+        return [os.path.relpath(os.path.join(root, name), entry)
+                for root, _, files in os.walk(entry) for name in files]
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until under max_size."""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(os.lstat(os.path.join(root, filename)).st_size
+                       for root, _, files in os.walk(path)
+                       for filename in files)
+            entries.append((os.stat(path).st_mtime, size, name))
+        total = sum(entry[1] for entry in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+            if name != keep:
+                log.info("Cache Evict {}.".format(name))
+                shutil.rmtree(os.path.join(self.directory, name), True)
+                self.index["costs"].pop(name, None)
+                self.index["sources"].pop(name, None)
+                total -= size
+        sources = set(self.index["sources"].values())
+        for path in list(self.index["hashes"]):  # Deleted or evicted archives
+            if path not in sources or not os.path.exists(path):
+                del self.index["hashes"][path]
+        return total
+
+
+def open_game_in_memory(game_file, password=b""):
+    """
+    Decrypt a ZIP or container Game to a MemoryFile,None if not fits.
+
+    Only Games that are just the .blend fit,linked libraries and textures
+    would be searched relative to /proc/<pid>/fd/ and never be found.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> archive = os.path.join(temp_dir, "game.zip")
+    >>> with ZipFile(archive, "w") as zipy:
+    ...     zipy.writestr("game/", b"")
+    ...     zipy.writestr("game/game.blend", b"BLENDER")
+    >>> memory_file = open_game_in_memory(archive)
+    >>> with open(memory_file.path, "rb") as blend:
+    ...     blend.read()
+    b'BLENDER'
+    >>> memory_file.close()
+    >>> with ZipFile(archive, "a") as zipy:
+    ...     zipy.writestr("game/textures/wall.png", b"PNG")
+    >>> open_game_in_memory(archive) is None
+    True
+    >>> shutil.rmtree(temp_dir)
+    """
+    if game_file.lower().endswith(CONTAINER_EXT):
+        raw_size = read_container_index(game_file, password)[1]
+        available = get_available_memory() or MEMORY_LIMIT
+        if raw_size > min(MEMORY_LIMIT, available):
+            log.info("Game too big for RAM: {} Bytes.".format(raw_size))
+            return None
+        memory_file = MemoryFile(
+            os.path.splitext(os.path.basename(game_file))[0] + ".blend")
+        try:
+            extract_game_container(game_file, password, memory_file.path)
+        except BaseException:
+            memory_file.close()
+            raise
+        return memory_file
+    with ZipFile(game_file, "r") as zipy:
+        members = [name for name in zipy.namelist() if not name.endswith("/")]
+    blend = find_game_blend(members, game_file)
+    if blend and len(members) > 1:
+        log.info("Game has {} files besides the .blend,not In-RAM.".format(
+            len(members) - 1))
+        return None
+    if blend:
+        return extract_to_memory(game_file, password or None, blend)
+
+
+def extract_game(game_file, password=b"", destination=os.curdir,
+                 progress=None):
+    """Extract a ZIP or container Game,return the list of extracted names."""
+    if game_file.lower().endswith(CONTAINER_EXT):
+        name = os.path.splitext(os.path.basename(game_file))[0] + ".blend"
+        extract_game_container(game_file, password,
+                               os.path.join(destination, name),
+                               progress=progress)
+        return [name]
+    return extract_game_archive(game_file, password or None, destination,
+                                progress=progress)
+
+
+def is_compressed_blend(blend_file):
+    """Return True if a .blend is gzip compressed,as Blender can save it."""
+    with open(blend_file, "rb") as blend:
+        return blend.read(2) == b"\x1f\x8b"
+
+
+def decompress_blend(blend_file, destination, progress=None):
+    """
+    Decompress a gzip .blend on a worker thread,return the Bytes written.
+
+    progress(done_bytes, total_bytes) of the compressed file is called often
+    while waiting,so a GUI can keep processing events.
+    """
+    total, position = os.path.getsize(blend_file) or 1, [0]
+
+    def decompress():
+        with open(blend_file, "rb") as raw, gzip.GzipFile(
+                fileobj=raw) as blend, open(destination, "wb") as output:
+            for chunk in iter(lambda: blend.read(CHUNK_SIZE), b""):
+                output.write(chunk)
+                position[0] = raw.tell()
+            return output.tell()
+
+    with ThreadPoolExecutor(1) as pool:
+        future = pool.submit(decompress)
+        while not wait([future], 0.05)[0]:
+            if progress:
+                progress(min(position[0], total), total)
+        if progress:
+            progress(total, total)
+        return future.result()
+
+
+def open_compressed_blend(blend_file, cache=None, progress=None):
+    """
+    Return a decompressed copy of a gzip .blend from the cache,else itself.
+
+    The files next to the .blend are symlinked next to the copy,so relative
+    paths of libraries and textures still resolve,if a library does not
+    the compressed .blend is returned and BlenderPlayer decompresses it.
+    Files next to a .blend inside of other cache entry are hard linked,
+    so they survive the LRU eviction of that entry.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> game_file = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+    ...                              ["//lib.blend"])
+    >>> _ = write_stub_blend(os.path.join(temp_dir, "lib.blend"))
+    >>> with open(game_file, "rb") as blend:
+    ...     data = blend.read()
+    >>> with gzip.open(game_file, "wb") as blend:
+    ...     _ = blend.write(data)
+    >>> cache = ExtractionCache(os.path.join(temp_dir, "cache"))
+    >>> path = open_compressed_blend(game_file, cache)
+    >>> is_compressed_blend(path), find_blend_libraries(path)[0] == (
+    ...     os.path.join(os.path.dirname(path), "lib.blend"))
+    (False, True)
+    >>> open_compressed_blend(game_file, cache) == path, cache.index["hits"]
+    (True, 1)
+    >>> shutil.rmtree(temp_dir)
+    """
+    if not is_compressed_blend(blend_file):
+        return blend_file
+    cache = cache or ExtractionCache()
+    blend_file = os.path.abspath(blend_file)
+    folder, name = os.path.split(blend_file)
+
+    cached = os.path.commonpath([folder, os.path.abspath(
+        cache.directory)]) == os.path.abspath(cache.directory)
+
+    def populate(temp_dir):
+        decompress_blend(blend_file, os.path.join(temp_dir, name), progress)
+        for sibling in os.listdir(folder):
+            source = os.path.join(folder, sibling)
+            if sibling == name:
+                continue
+            if not cached:
+                os.symlink(source, os.path.join(temp_dir, sibling))
+            elif os.path.isdir(source):
+                shutil.copytree(source, os.path.join(temp_dir, sibling),
+                                copy_function=os.link)
+            else:
+                os.link(source, os.path.join(temp_dir, sibling))
+        try:
+            libraries = find_blend_libraries(os.path.join(temp_dir, name))
+        except (ValueError, KeyError, TypeError, struct.error) as reason:
+            libraries = []  # Unknown .blend format,BlenderPlayer may know
+            log.debug(reason)
+        for library in libraries:
+            if not os.path.exists(library):
+                raise ValueError("Library not found: {}".format(library))
+
+    try:
+        entry = cache.lookup(blend_file, "", progress, folder) or (
+            cache.populate(blend_file, "", populate, folder))
+    except (OSError, ValueError, EOFError, zlib.error) as reason:
+        log.warning("Can not cache decompressed {}: {}".format(
+            blend_file, reason))
+        return blend_file
+    return os.path.join(entry, name)
+
+
+def benchmark_compressed_blend(size=64 * 1024 * 1024):
+    """
+    Benchmark loading a gzip .blend against its cached decompressed copy.
+
+    compressed reads it through gzip as BlenderPlayer does on every launch,
+    first is the cache miss,cached the lookup and read of later launches.
+
+    >>> sorted(benchmark_compressed_blend(1024 * 1024))
+    ['cached', 'compressed', 'first']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        game_file = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+                                     size=size)
+        with open(game_file, "rb") as blend:
+            data = blend.read()
+        with gzip.open(game_file, "wb") as blend:
+            blend.write(data)
+        del data
+        cache, results = ExtractionCache(os.path.join(temp_dir, "cache")), {}
+
+        def read_all(path, opener=open):
+            with opener(path, "rb") as blend:
+                while blend.read(CHUNK_SIZE):
+                    pass
+
+        started = time.perf_counter()
+        read_all(game_file, gzip.open)
+        results["compressed"] = time.perf_counter() - started
+        started = time.perf_counter()
+        open_compressed_blend(game_file, cache)
+        results["first"] = time.perf_counter() - started
+        started = time.perf_counter()
+        read_all(open_compressed_blend(game_file, cache))
+        results["cached"] = time.perf_counter() - started
+        log.info("Compressed .blend benchmark Seconds: {}".format(results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def open_game(game_file, pwd="", in_ram=False, cache=None, progress=None):
+    """
+    Open a ZIP or container Game,return (.blend path,MemoryFile or None).
+
+    In-RAM Games return a MemoryFile to close after the Game finished,
+    if it does not fit on RAM or has more files than the .blend it
+    fallbacks to the extraction cache,
+    a gzip .blend inside is decompressed once on the cache too.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> blend = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+    ...                          ["//lib.blend"])
+    >>> with open(blend, "rb") as blend_file:
+    ...     data = blend_file.read()
+    >>> archive = os.path.join(temp_dir, "game.zip")
+    >>> with ZipFile(archive, "w") as zipy:
+    ...     zipy.writestr("game.blend", gzip.compress(data))
+    ...     zipy.write(write_stub_blend(os.path.join(temp_dir, "lib.blend")),
+    ...                "lib.blend")
+    >>> cache = ExtractionCache(os.path.join(temp_dir, "cache"))
+    >>> path = open_game(archive, cache=cache)[0]
+    >>> shutil.rmtree(cache.lookup(archive))  # As evicted by the LRU
+    >>> library = os.path.join(os.path.dirname(path), "lib.blend")
+    >>> os.path.isfile(library), os.path.islink(library)
+    (True, False)
+    >>> shutil.rmtree(temp_dir)
+    """
+    password = str(pwd).encode("utf-8")
+    if in_ram:
+        memory_file = open_game_in_memory(game_file, password)
+        if memory_file:
+            return memory_file.path, memory_file
+    cache = cache or ExtractionCache()
+    entry = cache.lookup(game_file, pwd, progress)
+    if not entry:
+        entry = cache.populate(game_file, pwd, lambda temp_dir: extract_game(
+            game_file, password, temp_dir, progress))
+    blend = find_game_blend(cache.list_entry(entry), game_file)
+    return (open_compressed_blend(os.path.join(entry, blend), cache, progress)
+            if blend else None), None
+
+
+###############################################################################
+
+
+def read_blend_header(blend):
+    """
+    Read the header of an open .blend,return (pointer size,endian,version).
+
+    >>> read_blend_header(BytesIO(b"BLENDER-v279REND"))
+    (8, '<', '279')
+    >>> read_blend_header(BytesIO(b"\\x1f\\x8b\\x08"))
+    Traceback (most recent call last):
+    ...
+    ValueError: Not an uncompressed .blend file.
+    """
+    header = blend.read(12)
+    if len(header) != 12 or not header.startswith(b"BLENDER") or (
+            header[7:8] not in b"_-" or header[8:9] not in b"vV"):
+        raise ValueError("Not an uncompressed .blend file.")
+    return (4 if header[7:8] == b"_" else 8,
+            "<" if header[8:9] == b"v" else ">", header[9:12].decode())
+
+
+def iter_blend_blocks(blend, pointer_size, endian):
+    """Yield (code,size,SDNA index,count,data offset) of the blocks of .blend.
+
+    Only the block headers are read,data is skipped with a seek,so data
+    of a block can be read by the caller before the next block.
+    """
+    block = struct.Struct(endian + "4si" + (
+        "I" if pointer_size == 4 else "Q") + "ii")
+    while True:
+        header = blend.read(block.size)
+        if len(header) < block.size:
+            return
+        code, size, _, sdna_index, count = block.unpack(header)
+        if code == b"ENDB":
+            return
+        offset = blend.tell()
+        yield code, size, sdna_index, count, offset
+        blend.seek(offset + size)
+
+
+def parse_blend_sdna(data, pointer_size, endian):
+    """Parse the DNA1 block of a .blend,return {struct: [(field,offset,size)]}.
+
+    Offsets are in Bytes from the start of the struct,field names have no
+    pointer stars nor array sizes,arrays have the size of the whole array.
+    """
+    position = [8]  # After b"SDNANAME"
+
+    def read_names():
+        count = struct.unpack_from(endian + "i", data, position[0])[0]
+        names, start = [], position[0] + 4
+        for _ in range(count):
+            end = data.index(b"\0", start)
+            names.append(data[start:end].decode("utf-8", "replace"))
+            start = end + 1
+        position[0] = ((start + 3) & ~3) + 4  # Aligned,after the next tag
+        return names
+
+    names = read_names()
+    types = read_names()
+    lengths = struct.unpack_from(endian + str(len(types)) + "h", data,
+                                 position[0])
+    position[0] = (position[0] + 2 * len(types) + 3) & ~3
+    structs, offset = {}, position[0] + 8  # After b"STRC" and the count
+    for _ in range(struct.unpack_from(endian + "i", data, offset - 4)[0]):
+        type_index, count = struct.unpack_from(endian + "hh", data, offset)
+        fields, at = [], 0
+        for field in range(count):
+            field_type, field_name = struct.unpack_from(
+                endian + "hh", data, offset + 4 + 4 * field)
+            name = names[field_name]
+            size = pointer_size if name.startswith(("*", "(*")) else (
+                lengths[field_type])
+            for dimension in name.split("[")[1:]:
+                size *= int(dimension.rstrip("]"))
+            fields.append((name.lstrip("*(").split("[")[0].split(")")[0],
+                           at, size))
+            at += size
+        structs[types[type_index]] = fields
+        offset += 4 + 4 * count
+    return structs
+
+
+def find_blend_libraries(blend_file):
+    """
+    Return the absolute paths of the .blend libraries linked by a .blend.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> game_file = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+    ...                              ["//lib/a.blend", "/abs/b.blend"])
+    >>> find_blend_libraries(game_file) == [
+    ...     os.path.join(temp_dir, "lib", "a.blend"), "/abs/b.blend"]
+    True
+    >>> shutil.rmtree(temp_dir)
+    """
+    with open(blend_file, "rb") as blend:
+        pointer_size, endian, _ = read_blend_header(blend)
+        libraries, sdna = [], None
+        for code, size, _, _, offset in iter_blend_blocks(
+                blend, pointer_size, endian):
+            if code == b"LI\0\0":
+                libraries.append(offset)
+            elif code == b"DNA1":
+                sdna = parse_blend_sdna(blend.read(size), pointer_size,
+                                        endian)
+        if not libraries or not sdna:
+            return []
+        fields = {name: (at, size) for name, at, size in sdna["Library"]}
+        at, size = fields.get("name", fields.get("filepath"))  # Renamed 2.93
+        paths = []
+        for offset in libraries:
+            blend.seek(offset + at)
+            path = blend.read(size).split(b"\0")[0].decode("utf-8", "replace")
+            path = path.replace("\\", "/")
+            if path.startswith("//"):
+                path = os.path.join(os.path.dirname(blend_file), path[2:])
+            paths.append(os.path.normpath(os.path.abspath(path)))
+        return paths
+
+
+def write_stub_blend(blend_file, libraries=(), size=0, scenes=("Scene", )):
+    """Write a minimal .blend linking libraries,a stand-in for tests."""
+    endian, pointer_size = "<", 8
+    names, types = ["id", "*filedata", "name[1024]"], ["char", "void", "ID",
+                                                       "Library"]
+    lengths = [1, 0, 102, 102 + pointer_size + 1024]
+
+    def pad(data):
+        return data + bytes(-len(data) % 4)
+
+    sdna = b"SDNA" + pad(b"NAME" + struct.pack(endian + "i", len(names)) +
+                         b"".join(name.encode() + b"\0" for name in names))
+    sdna += pad(b"TYPE" + struct.pack(endian + "i", len(types)) +
+                b"".join(name.encode() + b"\0" for name in types))
+    sdna += pad(b"TLEN" + struct.pack(endian + str(len(types)) + "h",
+                                      *lengths))
+    sdna += b"STRC" + struct.pack(endian + "i8h", 1, 3, 3, 2, 0, 1, 1, 0, 2)
+
+    def block(code, data):
+        return struct.pack(endian + "4siQii", code, len(data), 0, 0,
+                           1) + data
+
+    with open(blend_file, "wb") as blend:
+        blend.write(b"BLENDER-v279")
+        blend.write(block(b"REND", b"".join(struct.pack(
+            endian + "ii64s", 1, 250, scene.encode()) for scene in scenes)))
+        for library in libraries:
+            blend.write(block(b"LI\0\0", bytes(102 + pointer_size) +
+                              library.encode().ljust(1024, b"\0")))
+        if size:  # Compressible about 4:1,as real .blend data
+            data = (os.urandom(1024) + bytes(3072)) * (size // 4096 + 1)
+            blend.write(block(b"DATA", data[:size]))
+        blend.write(block(b"DNA1", sdna) + block(b"ENDB", b""))
+    return blend_file
+
+
+def prefetch_files(paths, advice="POSIX_FADV_WILLNEED"):
+    """Ask the kernel to read files into the page cache,return Bytes asked.
+
+    Uses posix_fadvise,else reads the whole files,POSIX_FADV_DONTNEED evicts
+    them instead,to measure cold starts without root nor dropping all caches.
+    """
+    total = 0
+    for path in paths:
+        try:
+            with open(path, "rb") as prefetched:
+                size = os.fstat(prefetched.fileno()).st_size
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(prefetched.fileno(), 0, size,
+                                     getattr(os, advice))
+                elif advice == "POSIX_FADV_WILLNEED":
+                    while prefetched.read(CHUNK_SIZE):
+                        pass
+                total += size
+        except OSError as reason:
+            log.debug(reason)
+    return total
+
+
+def prefetch_game(blend_file, advice="POSIX_FADV_WILLNEED"):
+    """
+    Prefetch a .blend and all its libraries,recursively,return the paths.
+
+    The .blend is prefetched before reading its blocks,so the kernel reads
+    it ahead while the libraries are searched.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> library = write_stub_blend(os.path.join(temp_dir, "lib.blend"),
+    ...                            ["//missing.blend"])
+    >>> game_file = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+    ...                              ["//lib.blend", "//lib.blend"])
+    >>> [os.path.basename(path) for path in prefetch_game(game_file)]
+    ['game.blend', 'lib.blend']
+    >>> shutil.rmtree(temp_dir)
+    """
+    started, pending, done = time.perf_counter(), [blend_file], []
+    while pending:
+        path = os.path.abspath(pending.pop(0))
+        if path in done or not os.path.isfile(path):
+            continue
+        prefetch_files([path], advice)
+        done.append(path)
+        try:
+            pending.extend(find_blend_libraries(path))
+        except (OSError, ValueError, KeyError, TypeError,
+                struct.error) as reason:  # Compressed or not a .blend
+            log.debug("Can not read libraries of {}: {}".format(path, reason))
+    log.debug("Prefetched {} files in {:.3f} Seconds.".format(
+        len(done), time.perf_counter() - started))
+    return done
+
+
+def time_to_first_output(command):
+    """Run a command until its first output,return Seconds taken."""
+    started = time.perf_counter()
+    process = Popen(command, stdout=PIPE, stderr=STDOUT)
+    process.stdout.read(1)
+    elapsed = time.perf_counter() - started
+    process.stdout.close()
+    process.wait()
+    return elapsed
+
+
+def benchmark_prefetch(size=64 * 1024 * 1024, libraries=4):
+    """
+    Benchmark cold start time to first output with and without prefetch.
+
+    The player is a stub that reads the Game and then its libraries,caches
+    are evicted before each run,storage on RAM shows no difference.
+
+    >>> sorted(benchmark_prefetch(1024 * 1024, 2))
+    ['cold', 'prefetch']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        paths = [write_stub_blend(os.path.join(
+            temp_dir, "lib{}.blend".format(index)), size=size // (
+                libraries + 1)) for index in range(libraries)]
+        game_file = write_stub_blend(os.path.join(
+            temp_dir, "game.blend"), ["//" + os.path.basename(path)
+                                      for path in paths], size // (
+                libraries + 1))
+        command = [sys.executable, "-c", "import sys\nfor path in sys.argv["
+                   "1:]:\n    with open(path, 'rb') as f:\n        while "
+                   "f.read(65536): pass\nprint('ready')", game_file] + paths
+        results = {}
+        prefetch_game(game_file, "POSIX_FADV_DONTNEED")
+        results["cold"] = time_to_first_output(command)
+        prefetch_game(game_file, "POSIX_FADV_DONTNEED")
+        threading.Thread(target=prefetch_game, args=(game_file, ),
+                         daemon=True).start()
+        results["prefetch"] = time_to_first_output(command)
+        log.info("Prefetch benchmark Seconds to first output: {}".format(
+            results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+def scan_blend(blend):
+    """
+    Scan the header and block index of an open .blend,return its metadata.
+
+    Only block headers are read,plus the REND block with the scene names,
+    gzip compressed files stop there to not decompress the whole file.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> game_file = write_stub_blend(os.path.join(temp_dir, "game.blend"),
+    ...                              ["//lib.blend"], scenes=["Menu", "Map"])
+    >>> with open(game_file, "rb") as blend:
+    ...     metadata = scan_blend(blend)
+    >>> metadata["version"], metadata["scenes"], metadata["libraries"]
+    ('279', ['Menu', 'Map'], 1)
+    >>> with open(game_file, "rb") as blend, gzip.open(
+    ...         game_file + ".gz", "wb") as compressed:
+    ...     shutil.copyfileobj(blend, compressed)
+    >>> with open(game_file + ".gz", "rb") as blend:
+    ...     metadata = scan_blend(blend)
+    >>> metadata["compressed"], metadata["scenes"], metadata["blocks"]
+    (True, ['Menu', 'Map'], None)
+    >>> shutil.rmtree(temp_dir)
+    """
+    compressed = blend.read(2) == b"\x1f\x8b"
+    blend.seek(0)
+    if compressed:
+        blend = gzip.GzipFile(fileobj=blend)
+    pointer_size, endian, version = read_blend_header(blend)
+    metadata = {"version": version, "pointer_size": pointer_size,
+                "endian": "little" if endian == "<" else "big",
+                "compressed": compressed, "scenes": [], "blocks": 0,
+                "libraries": 0}
+    for code, size, _, _, _ in iter_blend_blocks(blend, pointer_size, endian):
+        metadata["blocks"] += 1
+        if code == b"REND":
+            data = blend.read(size)
+            metadata["scenes"] = [
+                data[at + 8:at + 72].split(b"\0")[0].decode(
+                    "utf-8", "replace") for at in range(0, size - 71, 72)]
+            if compressed:
+                metadata["blocks"] = metadata["libraries"] = None
+                break
+        elif code == b"LI\0\0":
+            metadata["libraries"] += 1
+    return metadata
+
+
+def scan_game_file(game_file):
+    """Scan a .blend or a .blend inside a ZIP,return its metadata,no raise."""
+    metadata = {"title": os.path.splitext(os.path.basename(game_file))[0],
+                "member": None, "encrypted": False, "error": None}
+    try:
+        if game_file.lower().endswith(".zip"):
+            with ZipFile(game_file, "r") as zipy:
+                metadata["member"] = find_game_blend(zipy.namelist(),
+                                                     game_file)
+                if not metadata["member"]:
+                    raise ValueError("No .blend file inside the ZIP.")
+                if zipy.getinfo(metadata["member"]).flag_bits & 0x1:
+                    metadata["encrypted"] = True  # Needs the SerialKey
+                    return metadata
+                with zipy.open(metadata["member"]) as blend:
+                    metadata.update(scan_blend(blend))
+        else:
+            with open(game_file, "rb") as blend:
+                metadata.update(scan_blend(blend))
+    except (OSError, ValueError, EOFError, zlib.error, struct.error,
+            zipfile.BadZipFile) as reason:
+        metadata["error"] = str(reason)
+    return metadata
+
+
+def _iter_game_files(directory):
+    """Yield (path,stat) of the .blend and .zip files of a folder tree."""
+    pending = [directory]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError as reason:
+            log.debug(reason)
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                pending.append(entry.path)
+            elif entry.name.lower().endswith((".blend", ".zip")):
+                try:
+                    yield os.path.abspath(entry.path), entry.stat()
+                except OSError as reason:
+                    log.debug(reason)
+
+
+class GameLibrary(object):
+
+    """Persistent SQLite index of the Games found on some folders.
+
+    Files are scanned by their header and block index only,rescans only
+    read files whose size or mtime changed,removed files are forgotten.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> for name in ("a.blend", "b.blend", "not-a-game.txt"):
+    ...     _ = write_stub_blend(os.path.join(temp_dir, name))
+    >>> library = GameLibrary(os.path.join(temp_dir, "library.sqlite"))
+    >>> library.add_directory(temp_dir)
+    {'scanned': 2, 'unchanged': 0, 'removed': 0}
+    >>> os.remove(os.path.join(temp_dir, "a.blend"))
+    >>> library.scan()
+    {'scanned': 0, 'unchanged': 1, 'removed': 1}
+    >>> [(game["title"], game["scenes"]) for game in library.games()]
+    [('b', ['Scene'])]
+    >>> library.close()
+    >>> shutil.rmtree(temp_dir)
+    """
+
+    COLUMNS = ("path", "size", "mtime", "title", "member", "encrypted",
+               "error", "version", "pointer_size", "endian", "compressed",
+               "scenes", "blocks", "libraries")
+
+    def __init__(self, index_file=None):
+        """Init class."""
+        self.index_file = index_file or os.path.join(CACHE_DIR,
+                                                     "library.sqlite")
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_file)),
+                    exist_ok=True)
+        self.database = sqlite3.connect(self.index_file)
+        self.database.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "CREATE TABLE IF NOT EXISTS directories (path TEXT PRIMARY KEY);"
+            "CREATE TABLE IF NOT EXISTS games ({});".format(", ".join(
+                column + (" TEXT PRIMARY KEY" if column == "path" else "")
+                for column in self.COLUMNS)))
+
+    def __str__(self):
+        """Representation of the library,Games and folders."""
+        return "Game Library: {} Games on {} folders.".format(
+            self.database.execute("SELECT COUNT(*) FROM games").fetchone()[0],
+            len(self.directories()))
+
+    def directories(self):
+        """Return the folders of the library."""
+        return [row[0] for row in self.database.execute(
+            "SELECT path FROM directories ORDER BY path")]
+
+    def add_directory(self, directory):
+        """Add a folder to the library and scan it,return the scan stats."""
+        directory = os.path.abspath(directory)
+        with self.database:
+            self.database.execute("INSERT OR IGNORE INTO directories VALUES "
+                                  "(?)", (directory, ))
+        return self.scan([directory])
+
+    def scan(self, directories=None):
+        """Scan the folders of the library,return the scan stats."""
+        directories = directories or self.directories()
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.database.execute("SELECT path,size,mtime FROM games")}
+        stats, seen, rows = {"scanned": 0, "unchanged": 0, "removed": 0}, (
+            set()), []
+        for directory in directories:
+            for path, stat in _iter_game_files(directory):
+                seen.add(path)
+                if known.get(path) == (stat.st_size, stat.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                metadata = scan_game_file(path)
+                metadata.update(path=path, size=stat.st_size,
+                                mtime=stat.st_mtime_ns,
+                                scenes=json.dumps(metadata.get("scenes")))
+                rows.append([metadata.get(column) for column in self.COLUMNS])
+        removed = [(path, ) for path in known if path not in seen and any(
+            path.startswith(os.path.join(directory, ""))
+            for directory in directories)]
+        stats["scanned"], stats["removed"] = len(rows), len(removed)
+        with self.database:
+            self.database.executemany("INSERT OR REPLACE INTO games VALUES "
+                                      "({})".format(", ".join(
+                                          "?" * len(self.COLUMNS))), rows)
+            self.database.executemany("DELETE FROM games WHERE path = ?",
+                                      removed)
+        log.info("Game Library scanned: {}".format(stats))
+        return stats
+
+    def games(self):
+        """Return the Games of the library as dicts,sorted by title."""
+        games = []
+        for row in self.database.execute("SELECT {} FROM games ORDER BY "
+                                         "title,path".format(
+                                             ",".join(self.COLUMNS))):
+            game = dict(zip(self.COLUMNS, row))
+            game["scenes"] = json.loads(game["scenes"] or "null")
+            games.append(game)
+        return games
+
+    def close(self):
+        """Close the SQLite database."""
+        self.database.close()
+
+
+def benchmark_library(files=10000):
+    """
+    Benchmark the first scan and the rescan of a folder of Games.
+
+    Returns a dict with Seconds of each scan,files on 100 folders.
+
+    >>> sorted(benchmark_library(200))
+    ['rescan', 'scan']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        stub = write_stub_blend(os.path.join(temp_dir, "stub.blend"),
+                                ["//lib.blend"], 4096, ["Menu", "Level"])
+        for index in range(files):
+            folder = os.path.join(temp_dir, "games", str(index % 100))
+            os.makedirs(folder, exist_ok=True)
+            shutil.copyfile(stub, os.path.join(folder, "{}.blend".format(
+                index)))
+        library = GameLibrary(os.path.join(temp_dir, "library.sqlite"))
+        results = {}
+        started = time.perf_counter()
+        library.add_directory(os.path.join(temp_dir, "games"))
+        results["scan"] = time.perf_counter() - started
+        started = time.perf_counter()
+        library.scan()
+        results["rescan"] = time.perf_counter() - started
+        library.close()
+        log.info("Game Library benchmark Seconds for {} files: {}".format(
+            files, results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+DOME_MODES = ("Fisheye", "TruncatedFront", "TruncatedRear", "CubeMap",
+              "SphericalPanoramic")
+STEREO_MODES = ("NoStereo", "Anaglyph", "SideBySide", "SyncDoubling",
+                "3DTVTopBottom", "Interlace", "VInterlace", "HWPageFlip")
+PRIORITY_PROFILES = {  # Scheduling of the Game: nice,(IO class,level),CPUs
+    "Normal": (0, (2, 4), None), "Game": (-10, (2, 0), "exclusive"),
+    "Background": (10, (2, 7), None), "Idle": (19, (3, 0), None)}
+IOPRIO_SYSCALLS = {  # ioprio_set and ioprio_get syscall numbers,Linux
+    "x86_64": (251, 252), "i686": (289, 290), "aarch64": (30, 31),
+    "armv7l": (314, 315), "ppc64le": (273, 274)}
+
+
+class LaunchOptions(object):
+
+    """Launch options of BlenderPlayer,validated once,build an exact argv.
+
+    Needs no Qt, so batch tools can build thousands of combinations,
+    serialized as JSON,the same format of the launch profile files.
+
+    >>> LaunchOptions().argv("my game.blend")
+    ['blenderplayer', '-m', '16', '-w', '640', '480', 'my game.blend']
+    >>> LaunchOptions(dome=True, dome_mode="CubeMap").argv("g.blend")[3:9]
+    ['-D', 'mode', 'cubemap', '-D', 'angle', '10']
+    >>> LaunchOptions(position="1920,0").argv("g.blend")[6:11]
+    ['-p', '1920', '0', '640', '480']
+    >>> LaunchOptions(samples=99)
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid launch option samples: 99
+    """
+
+    DEFAULTS = {
+        "game": GAME_FILE, "player": "blenderplayer", "debug": False,
+        "antialias": True, "samples": 16, "dome": False,
+        "dome_mode": DOME_MODES[0], "dome_angle": 10, "dome_tilt": 10,
+        "stereo": False, "stereo_mode": STEREO_MODES[0], "no_audio": False,
+        "fixed_time": False, "no_mipmaps": False, "show_framerate": False,
+        "show_properties": False, "show_profile": False,
+        "blender_material": False, "show_deprecations": False,
+        "fullscreen": False, "autodetect": False, "width": 640,
+        "height": 480, "bpp": 32, "wallpaper": False, "slow_hdd": False,
+        "slow_cpu": False, "in_ram": False, "telemetry": False,
+        "prefetch": False, "priority": "Normal", "cpus": "", "position": ""}
+    __slots__ = tuple(sorted(DEFAULTS))
+
+    def __init__(self, **options):
+        """Init class."""
+        for key, default in self.DEFAULTS.items():
+            value = options.pop(key, default)
+            if isinstance(default, int) and not isinstance(default, bool):
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid launch option {}: {}".format(
+                        key, value))
+            setattr(self, key, value)
+        if options:
+            raise ValueError("Unknown launch options: {}".format(
+                ", ".join(sorted(options))))
+        self.validate()
+
+    def __repr__(self):
+        """Representation of the options that differ from the defaults."""
+        return "{}({})".format(self.__class__.__name__, ", ".join(
+            "{}={!r}".format(key, getattr(self, key)) for key in
+            self.__slots__ if getattr(self, key) != self.DEFAULTS[key]))
+
+    def __eq__(self, other):
+        """Compare all the options."""
+        return isinstance(other, LaunchOptions) and (
+            self.to_dict() == other.to_dict())
+
+    def validate(self):
+        """Raise ValueError if any option is invalid."""
+        checks = {
+            "samples": 2 <= self.samples <= 16,
+            "dome_mode": self.dome_mode in DOME_MODES,
+            "dome_angle": 10 <= self.dome_angle <= 360,
+            "dome_tilt": 10 <= self.dome_tilt <= 360,
+            "stereo_mode": self.stereo_mode in STEREO_MODES,
+            "width": self.width >= 0, "height": self.height >= 0,
+            "bpp": self.bpp in (8, 16, 32),
+            "game": isinstance(self.game, str) and bool(self.game),
+            "player": isinstance(self.player, str) and bool(self.player),
+            "priority": self.priority in PRIORITY_PROFILES,
+            "cpus": isinstance(self.cpus, str) and all(
+                part.strip().replace("-", "", 1).isdigit()
+                for part in self.cpus.split(",")) if self.cpus else True,
+            "position": isinstance(self.position, str) and (
+                not self.position or (self.position.count(",") == 1 and all(
+                    part.strip().lstrip("-").isdigit()
+                    for part in self.position.split(","))))}
+        for key, default in self.DEFAULTS.items():
+            if isinstance(default, bool):
+                checks[key] = isinstance(getattr(self, key), bool)
+        for key, valid in sorted(checks.items()):
+            if not valid:
+                raise ValueError("Invalid launch option {}: {}".format(
+                    key, getattr(self, key)))
+        return self
+
+    def to_dict(self):
+        """Return all the options as a dict."""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    @classmethod
+    def from_file(cls, profile_file):
+        """Load from a JSON profile,missing options take default values."""
+        with open(profile_file, "r") as profile_json:
+            return cls(**json.load(profile_json))
+
+    def to_file(self, profile_file):
+        """Save as a JSON profile."""
+        with open(profile_file, "w") as profile_json:
+            json.dump(self.to_dict(), profile_json, indent=4, sort_keys=True)
+        return profile_file
+
+    def argv(self, game_file=None, desktop_win_id=None):
+        """Return the exact argument list to run BlenderPlayer,no shell."""
+        argv = []
+        if self.slow_hdd:
+            argv += ["ionice", "--ignore", "--class", "3"]
+        if self.slow_cpu:
+            argv += ["chrt", "--verbose", "--idle", "0"]
+        argv.append(self.player)
+        if self.debug:
+            argv.append("-d")
+        if self.antialias:
+            argv += ["-m", str(self.samples)]
+        if self.dome:
+            argv += ["-D", "mode", self.dome_mode.lower(),
+                     "-D", "angle", str(self.dome_angle),
+                     "-D", "tilt", str(self.dome_tilt)]
+        if self.stereo:
+            argv += ["-s", self.stereo_mode.lower()]
+        for enabled, option in (
+                (self.no_audio, "noaudio"), (self.fixed_time, "fixedtime=1"),
+                (self.no_mipmaps, "nomipmap=1"),
+                (self.show_framerate, "show_framerate=1"),
+                (self.show_properties, "show_properties=1"),
+                (self.show_profile, "show_profile=1"),
+                (self.blender_material, "blender_material=1"),
+                (self.show_deprecations, "ignore_deprecation_warnings=0")):
+            if enabled:
+                argv += ["-g", option]
+        autodetect = self.autodetect and self.fullscreen
+        argv += ["-f" if self.fullscreen else "-w",
+                 "0" if autodetect else str(self.width),
+                 "0" if autodetect else str(self.height)]
+        if self.fullscreen:
+            argv.append(str(self.bpp))
+        elif self.position:  # Window on a screen,left and top of the window
+            argv += ["-p"] + [part.strip() for part in self.position.split(
+                ",")] + [str(self.width), str(self.height)]
+        if self.wallpaper and desktop_win_id:
+            argv += ["-i", str(desktop_win_id)]
+        argv.append(game_file or self.game)
+        return argv
+
+
+def parse_cpu_list(cpus):
+    """
+    Parse a CPU list like "0-2,5",as on /proc and taskset,return a list.
+
+    >>> parse_cpu_list("0-2,5"), parse_cpu_list("")
+    ([0, 1, 2, 5], [])
+    """
+    parsed = set()
+    for part in str(cpus).replace(" ", "").split(","):
+        if part:
+            first, _, last = part.partition("-")
+            parsed.update(range(int(first), int(last or first) + 1))
+    return sorted(parsed)
+
+
+def format_cpu_list(cpus):
+    """
+    Format CPUs as a short CPU list,the inverse of parse_cpu_list.
+
+    >>> format_cpu_list([0, 1, 2, 5])
+    '0-2,5'
+    """
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else "{}-{}".format(
+        first, last) for first, last in ranges)
+
+
+def priority_settings(options, available=None):
+    """
+    Return the scheduling of the Game for LaunchOptions,as a dict.
+
+    nice,ionice (class,level) and cpus of the Game,launcher_cpus for the
+    launcher,None keeps them as they are. slow_cpu and slow_hdd run the
+    Game under chrt and ionice,so those win over the profile.
+
+    >>> settings = priority_settings(LaunchOptions(priority="Game"),
+    ...                              [0, 1, 2, 3])
+    >>> settings["nice"], settings["cpus"], settings["launcher_cpus"]
+    (-10, [1, 2, 3], [0])
+    >>> settings = priority_settings(LaunchOptions(cpus="2", slow_hdd=True),
+    ...                              [0, 1, 2, 3])
+    >>> settings["ionice"], settings["cpus"], settings["launcher_cpus"]
+    (None, [2], [0, 1, 3])
+    """
+    if available is None:
+        available = os.sched_getaffinity(0) if hasattr(
+            os, "sched_getaffinity") else ()
+    available = sorted(available)
+    nice, ionice, cpus = PRIORITY_PROFILES[options.priority]
+    if options.cpus:
+        cpus = [cpu for cpu in parse_cpu_list(options.cpus)
+                if cpu in available] or None
+    elif cpus == "exclusive":
+        cpus = available[1:] or None  # First CPU for the launcher
+    launcher_cpus = [cpu for cpu in available if cpu not in cpus] if (
+        cpus) else None
+    return {"profile": options.priority,
+            "nice": None if options.slow_cpu else nice,
+            "ionice": None if options.slow_hdd else ionice, "cpus": cpus,
+            "launcher_cpus": launcher_cpus or None}
+
+
+def _io_priority(tid, ionice=None):
+    """Get,or set if ionice,the IO (class,level) of a thread,Linux only.
+
+    Returns None if not supported,False if setting it was not permitted.
+    """
+    syscalls = IOPRIO_SYSCALLS.get(platform.machine())
+    if not syscalls or not sys.platform.startswith("linux"):
+        return None
+    libc = cdll.LoadLibrary("libc.so.6")
+    if ionice is None:
+        value = libc.syscall(syscalls[1], 1, tid)  # IOPRIO_WHO_PROCESS
+        return None if value < 0 else (value >> 13, value & 0xff)
+    return libc.syscall(syscalls[0], 1, tid, ionice[0] << 13 | ionice[1]) == 0
+
+
+def read_scheduling(pid):
+    """
+    Return the nice,IO priority and CPUs of a process,read from /proc.
+
+    >>> sorted(read_scheduling(os.getpid()))
+    ['cpus', 'ionice', 'nice']
+    """
+    with open("/proc/{}/stat".format(pid), "r") as stat:
+        nice = int(stat.read().rsplit(")", 1)[1].split()[16])
+    with open("/proc/{}/status".format(pid), "r") as status:
+        cpus = [parse_cpu_list(line.split(":", 1)[1]) for line in status
+                if line.startswith("Cpus_allowed_list:")]
+    return {"nice": nice, "ionice": _io_priority(pid),
+            "cpus": cpus[0] if cpus else None}
+
+
+def apply_priority(pid, settings):
+    """
+    Apply scheduling settings to all the threads of a process tree.
+
+    Linux nice and CPU affinity are per thread,so every thread is set.
+    Returns the scheduling read back from /proc,with the settings that
+    were not permitted,raising priority needs CAP_SYS_NICE or RLIMIT_NICE.
+
+    >>> child = Popen(["sleep", "9"])
+    >>> cpu = min(os.sched_getaffinity(0))
+    >>> scheduling = apply_priority(child.pid, {
+    ...     "profile": "Background", "nice": 10, "ionice": (2, 7),
+    ...     "cpus": [cpu], "launcher_cpus": None})
+    >>> scheduling == dict(read_scheduling(child.pid), profile="Background",
+    ...                    denied=scheduling["denied"])
+    True
+    >>> read_scheduling(child.pid)["nice"], read_scheduling(child.pid)[
+    ...     "cpus"] == [cpu]
+    (10, True)
+    >>> child.kill()
+    >>> child.wait()
+    -9
+    """
+    tids, denied = [], set()
+    for each in [pid] + (get_child_pids(pid) if pid != os.getpid() else []):
+        try:
+            tids.extend(int(tid) for tid in os.listdir(
+                "/proc/{}/task".format(each)))
+        except OSError:
+            tids.append(each)
+    for tid in tids:
+        try:
+            if settings["nice"] is not None:
+                os.setpriority(os.PRIO_PROCESS, tid, settings["nice"])
+        except PermissionError:
+            denied.add("nice")
+        except OSError as reason:  # Thread already finished
+            log.debug(reason)
+        if settings["ionice"] is not None and _io_priority(
+                tid, settings["ionice"]) is False:
+            denied.add("ionice")
+        try:
+            if settings["cpus"] and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(tid, settings["cpus"])
+        except OSError as reason:
+            denied.add("cpus")
+            log.debug(reason)
+    scheduling = read_scheduling(pid)
+    scheduling.update(profile=settings["profile"], denied=sorted(denied))
+    log.info(format_scheduling(scheduling))
+    return scheduling
+
+
+def set_launcher_cpus(cpus):
+    """Pin all the threads of the launcher to cpus,off the Game cores."""
+    for tid in os.listdir("/proc/{}/task".format(os.getpid())):
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except OSError as reason:
+            log.debug(reason)
+
+
+def format_scheduling(scheduling):
+    """
+    Format the scheduling applied to the Game,for logs and status bar.
+
+    >>> format_scheduling({"profile": "Game", "nice": 0, "ionice": (2, 0),
+    ...                    "cpus": [1, 2, 3], "denied": ["nice"]})
+    'Priority Game: Nice 0,IO 2/0,CPUs 1-3 (nice not permitted)'
+    """
+    return "Priority {}: Nice {},IO {},CPUs {}{}".format(
+        scheduling["profile"], scheduling["nice"], "/".join(
+            str(value) for value in scheduling["ionice"]) if (
+            scheduling["ionice"]) else "?", format_cpu_list(
+            scheduling["cpus"] or []), " ({} not permitted)".format(
+            ",".join(scheduling["denied"])) if scheduling["denied"] else "")
+
+
+def get_process_uptime():
+    """
+    Return the Seconds since this process was started, from /proc.
+
+    >>> get_process_uptime() >= 0
+    True
+    """
+    try:
+        with open("/proc/self/stat", "r") as stat:
+            started = int(stat.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as uptime:
+            return float(uptime.read().split()[0]) - (
+                started / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError) as reason:
+        log.debug(reason)
+        return time.process_time()
+
+
+def read_serial_key():
+    """Return the Game SerialKey,asked on a terminal or read from stdin."""
+    if len(PASSWORD):
+        return codecs.decode(PASSWORD, "rot13")
+    if sys.stdin.isatty():
+        return getpass("Game SerialKey: ")
+    return sys.stdin.readline().strip()
+
+
+def open_game_headless(options, game_file=None):
+    """Open the Game of options without GUI,return .blend path or None."""
+    game_file = game_file or options.game
+    if game_file.lower().endswith((".zip", CONTAINER_EXT)):
+        try:
+            game_file = open_game(game_file, read_serial_key(),
+                                  options.in_ram)[0]
+        except Exception as reason:
+            log.error(reason)
+            return None
+    if not game_file or not os.path.isfile(game_file):
+        log.error("Game file not found: {}".format(game_file))
+        return None
+    return open_compressed_blend(game_file)
+
+
+def fork_detached(function, *args):
+    """
+    Run function on a double forked process,reaped by init not by caller.
+
+    The caller can exec a player that never waits for children,the
+    process that runs function is not its child,so it leaves no zombie.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> marker = os.path.join(temp_dir, "done")
+    >>> fork_detached(lambda: open(marker, "w").close())
+    >>> while not os.path.exists(marker):
+    ...     time.sleep(0.01)
+    >>> shutil.rmtree(temp_dir)
+    """
+    child = os.fork()
+    if child == 0:
+        try:
+            os.setsid()
+            if os.fork() == 0:
+                try:
+                    function(*args)
+                finally:
+                    os._exit(0)
+        finally:
+            os._exit(0)
+    os.waitpid(child, 0)  # The middle process exits at once
+
+
+def quick_launch(profile_file, game_file=None):
+    """Exec BlenderPlayer from a saved profile,without importing Qt at all."""
+    options = apply_tuned_settings(LaunchOptions.from_file(profile_file),
+                                   game_file)
+    with TRACER.span("open game"):
+        game_file = open_game_headless(options, game_file)
+    if not game_file:
+        return 1
+    if options.wallpaper:
+        log.warning("Wallpaper mode needs the GUI,ignored on quick launch.")
+    command = options.argv(game_file)
+    try:  # Applied to this process,inherited by the player after exec
+        apply_priority(os.getpid(), priority_settings(options))
+    except OSError as reason:
+        log.warning(reason)
+    if options.prefetch and hasattr(os, "fork"):
+        fork_detached(prefetch_game, game_file)  # While the player execs
+    log.info("Launcher overhead {:.3f} Seconds since process start.".format(
+        get_process_uptime()))
+    log.debug(command)
+    TRACER.save()  # No atexit after exec
+    os.execvp(command[0], command)  # In-RAM memfds survive,same PID
+
+
+def benchmark_quick_launch():
+    """
+    Benchmark the launcher overhead of the quick launch and the GUI.
+
+    The player is /bin/true, headless is the whole quick launch until exec,
+    gui is the interpreter plus importing Qt and building the MainWindow.
+
+    >>> sorted(benchmark_quick_launch())
+    ['gui', 'headless']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    try:
+        game_file = os.path.join(temp_dir, "game.blend")
+        open(game_file, "wb").close()
+        profile_file = LaunchOptions(game=game_file, player="true").to_file(
+            os.path.join(temp_dir, "profile.json"))
+        results = {}
+        started = time.perf_counter()
+        call((sys.executable, os.path.abspath(__file__), "--launch",
+              profile_file))
+        results["headless"] = time.perf_counter() - started
+        started = time.perf_counter()
+        call((sys.executable, "-c", "import runpy;g=runpy.run_path({!r});"
+              "a=g['QApplication'](['bgelauncher']);g['MainWindow']()"
+              .format(os.path.abspath(__file__))))
+        results["gui"] = time.perf_counter() - started
+        log.info("Quick launch benchmark: {}".format(results))
+        return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+TELEMETRY_HOOK = """# Injected by BGElauncher,sends frame times and profile.
+import json, sys, threading, time
+
+
+def _install():
+    last, frames, window = [None], [0], [0.0]
+
+    def _sample(*args):
+        from bge import logic
+        now = time.perf_counter()
+        if last[0] is None:
+            last[0] = now
+            return
+        frames[0], window[0] = frames[0] + 1, window[0] + now - last[0]
+        last[0] = now
+        if window[0] < 0.25:
+            return
+        sample = {"frame_time": 1000.0 * window[0] / frames[0],
+                  "fps": logic.getAverageFrameRate()}
+        if hasattr(logic, "getProfileInfo"):  # UPBGE
+            for name, info in logic.getProfileInfo().items():
+                sample[name.lower()] = info.get("time", 0.0)
+        frames[0], window[0] = 0, 0.0
+        sys.stdout.write("%s%s\\n" % (PREFIX, json.dumps(sample)))
+        sys.stdout.flush()
+
+    while True:  # Hook the scene when the Game Engine runs,again on changes
+        time.sleep(1)
+        try:
+            from bge import logic
+            scene = logic.getCurrentScene()
+            if _sample not in scene.post_draw:
+                scene.post_draw.append(_sample)
+        except Exception:
+            pass
+
+
+threading.Thread(target=_install, daemon=True).start()
+"""
+
+
+_TELEMETRY_HOOK_DIR, _TELEMETRY_HOOK_LOCK = [], threading.Lock()
+
+
+def telemetry_hook_dir():
+    """
+    Return the private directory of the telemetry hook,written once.
+
+    A new 0700 directory of this process,no other user can plant a hook
+    on it,threads of a --pinned bench share it,it is removed at exit.
+
+    >>> hook_dir = telemetry_hook_dir()
+    >>> oct(os.stat(hook_dir).st_mode & 0o777), hook_dir == (
+    ...     telemetry_hook_dir())
+    ('0o700', True)
+    """
+    with _TELEMETRY_HOOK_LOCK:
+        if not _TELEMETRY_HOOK_DIR:
+            hook_dir = mkdtemp(prefix="bgelauncher-telemetry-")
+            with open(os.path.join(hook_dir, "sitecustomize.py"), "w") as (
+                    hook):
+                hook.write(TELEMETRY_HOOK.replace(
+                    "PREFIX", repr(TELEMETRY_PREFIX), 1))
+            atexit.register(shutil.rmtree, hook_dir, True)
+            _TELEMETRY_HOOK_DIR.append(hook_dir)
+        return _TELEMETRY_HOOK_DIR[0]
+
+
+def telemetry_environment(environment=None):
+    """
+    Return a copy of environment with the telemetry hook on the PYTHONPATH.
+
+    The hook is a sitecustomize module,BlenderPlayer imports it at start,
+    it appends a post_draw callback to the running scene,that writes JSON
+    samples of frame time,FPS and profile to stdout,prefixed to be parsed.
+
+    >>> telemetry_environment({})["PYTHONPATH"] == telemetry_hook_dir()
+    True
+    """
+    environment = dict(os.environ if environment is None else environment)
+    hook_dir = telemetry_hook_dir()
+    environment["PYTHONPATH"] = os.pathsep.join(
+        path for path in (hook_dir, environment.get("PYTHONPATH")) if path)
+    return environment
+
+
+class TelemetrySeries(object):
+
+    """Compact time series of telemetry samples,one array per column.
+
+    >>> series = TelemetrySeries()
+    >>> series.add_line(TELEMETRY_PREFIX + '{"frame_time": 16.0, "fps": 60}')
+    True
+    >>> series.add({"frame_time": 20.0, "fps": 50, "physics": 2.5})
+    >>> series.columns["physics"].tolist()[1:]
+    [2.5]
+    >>> series.summary()["frame_time"]["max"]
+    20.0
+    """
+
+    def __init__(self):
+        """Init class."""
+        self.time, self.columns, self._started = array("d"), {}, None
+
+    def __len__(self):
+        """Number of samples."""
+        return len(self.time)
+
+    def add(self, sample, when=None):
+        """Add a sample dict of floats,new columns are padded with NaN."""
+        when = time.time() if when is None else when
+        self._started = self._started or when
+        for name in sample:
+            if name not in self.columns:
+                self.columns[name] = array("d", [float("nan")] * len(self))
+        for name, column in self.columns.items():
+            column.append(float(sample.get(name, float("nan"))))
+        self.time.append(when - self._started)
+
+    def add_line(self, line):
+        """Parse and add a prefixed line from the hook,return True if so."""
+        if not line.startswith(TELEMETRY_PREFIX):
+            return False
+        try:
+            self.add(json.loads(line[len(TELEMETRY_PREFIX):]))
+        except (ValueError, TypeError, AttributeError) as reason:
+            log.debug(reason)
+        return True
+
+    def last(self):
+        """Return the last sample as a dict."""
+        return {name: column[-1] for name, column in self.columns.items()
+                if len(column)}
+
+    def summary(self):
+        """Return mean,min,max and 95th percentile of each column."""
+        result = {}
+        for name, column in self.columns.items():
+            values = sorted(value for value in column if value == value)
+            if values:
+                result[name] = {
+                    "mean": sum(values) / len(values), "min": values[0],
+                    "max": values[-1],
+                    "p95": values[min(len(values) - 1,
+                                      int(len(values) * 0.95))]}
+        return result
+
+    def to_csv(self, csv_file):
+        """Export as CSV, one row per sample."""
+        names = sorted(self.columns)
+        with open(csv_file, "w") as output:
+            output.write(",".join(["time"] + names) + "\n")
+            for row, when in enumerate(self.time):
+                output.write(",".join(["{:.3f}".format(when)] + [
+                    repr(self.columns[name][row]) for name in names]) + "\n")
+        return csv_file
+
+    def to_json(self, json_file):
+        """Export as JSON, the columns and the summary."""
+        with open(json_file, "w") as output:
+            json.dump({"time": self.time.tolist(), "summary": self.summary(),
+                       "columns": {name: column.tolist() for name, column
+                                   in self.columns.items()}}, output)
+        return json_file
+
+
+###############################################################################
+
+
+def get_child_pids(pid):
+    """
+    Return the PIDs of all the descendants of a process, from /proc.
+
+    >>> isinstance(get_child_pids(os.getpid()), list)
+    True
+    """
+    children, pending = [], [pid]
+    while pending:
+        parent = pending.pop()
+        try:
+            for task in os.listdir("/proc/{}/task".format(parent)):
+                with open("/proc/{}/task/{}/children".format(
+                        parent, task), "r") as children_file:
+                    found = [int(pid) for pid in children_file.read().split()]
+                children.extend(found)
+                pending.extend(found)
+        except OSError:
+            continue
+    return children
+
+
+def read_process_stats(pid):
+    """
+    Return CPU time,RAM,IO and context switches of a process,from /proc.
+
+    >>> sorted(read_process_stats(os.getpid()))[:3]
+    ['context_switches', 'cpu_seconds', 'peak_rss']
+    """
+    stats = dict.fromkeys(("cpu_seconds", "rss", "peak_rss", "read_bytes",
+                           "write_bytes", "context_switches"), 0.0)
+    with open("/proc/{}/stat".format(pid), "r") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    stats["cpu_seconds"] = (int(fields[11]) + int(fields[12])) / (
+        os.sysconf("SC_CLK_TCK"))
+    with open("/proc/{}/status".format(pid), "r") as status:
+        for line in status:
+            name, _, value = line.partition(":")
+            if name == "VmRSS":
+                stats["rss"] = int(value.split()[0]) * 1024.0
+            elif name == "VmHWM":
+                stats["peak_rss"] = int(value.split()[0]) * 1024.0
+            elif name.endswith("ctxt_switches"):
+                stats["context_switches"] += int(value)
+    try:  # Not readable for processes of other users
+        with open("/proc/{}/io".format(pid), "r") as io_file:
+            for line in io_file:
+                name, _, value = line.partition(":")
+                if name in ("read_bytes", "write_bytes"):
+                    stats[name] = float(value)
+    except OSError as reason:
+        log.debug(reason)
+    return stats
+
+
+class ResourceMonitor(object):
+
+    """Sampler of the resources used by a process and all its descendants.
+
+    Samples are kept on a TelemetrySeries,cheap arrays of floats.
+
+    >>> monitor = ResourceMonitor(os.getpid())
+    >>> monitor.sample()
+    True
+    >>> monitor.summary()["samples"]
+    1
+    """
+
+    def __init__(self, pid):
+        """Init class."""
+        self.pid, self.series, self.peak_rss = pid, TelemetrySeries(), 0.0
+        self.started = time.time()
+
+    def sample(self):
+        """Take a sample of all the processes,return False if ended."""
+        totals = {}
+        for pid in [self.pid] + get_child_pids(self.pid):
+            try:
+                stats = read_process_stats(pid)
+            except (OSError, ValueError, IndexError):
+                continue  # Finished between the listing and the reading
+            for name, value in stats.items():
+                totals[name] = totals.get(name, 0.0) + value
+        if not totals:
+            return False
+        self.peak_rss = max(self.peak_rss, totals["rss"], totals["peak_rss"])
+        self.series.add(totals)
+        return True
+
+    def summary(self):
+        """Return a summary of the run."""
+        last = self.series.last()
+        return {"pid": self.pid, "samples": len(self.series),
+                "duration": time.time() - self.started,
+                "cpu_seconds": last.get("cpu_seconds", 0.0),
+                "peak_rss": self.peak_rss,
+                "read_bytes": last.get("read_bytes", 0.0),
+                "write_bytes": last.get("write_bytes", 0.0),
+                "context_switches": last.get("context_switches", 0.0),
+                "series": self.series.summary()}
+
+    def to_json(self, json_file):
+        """Write the summary of the run as JSON."""
+        with open(json_file, "w") as output:
+            json.dump(self.summary(), output, indent=4, sort_keys=True)
+        return json_file
+
+
+###############################################################################
+
+
+def on_battery(power_supply="/sys/class/power_supply"):
+    """
+    Return True if on battery,False if on AC,None if unknown,from sysfs.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> for name, kind, online in (("AC", "Mains", "0"), ("BAT0", "Battery",
+    ...                                                   "1")):
+    ...     os.mkdir(os.path.join(temp_dir, name))
+    ...     for key, value in (("type", kind), ("online", online)):
+    ...         with open(os.path.join(temp_dir, name, key), "w") as file:
+    ...             _ = file.write(value + "\\n")
+    >>> on_battery(temp_dir)
+    True
+    >>> with open(os.path.join(temp_dir, "AC", "online"), "w") as file:
+    ...     _ = file.write("1\\n")
+    >>> on_battery(temp_dir), on_battery(os.path.join(temp_dir, "BAT0"))
+    (False, None)
+    >>> shutil.rmtree(temp_dir)
+    """
+    battery = None
+    try:
+        supplies = os.listdir(power_supply)
+    except OSError:
+        return None
+    for supply in supplies:
+        try:
+            with open(os.path.join(power_supply, supply, "type"), "r") as kind:
+                if kind.read().strip() != "Mains":
+                    continue
+            with open(os.path.join(power_supply, supply, "online"), "r") as (
+                    online):
+                if online.read().strip() == "1":
+                    return False
+            battery = True
+        except OSError:
+            continue
+    return battery
+
+
+class _XScreenSaverInfo(Structure):
+
+    """XScreenSaverInfo of the X11 ScreenSaver extension."""
+
+    _fields_ = (("window", c_ulong), ("state", c_int), ("kind", c_int),
+                ("til_or_since", c_ulong), ("idle", c_ulong),
+                ("event_mask", c_ulong))
+
+
+class X11Desktop(object):
+
+    """Idle time,screensaver and covered Desktop,from X11 by ctypes.
+
+    Methods return None without X11 or without the ScreenSaver extension,
+    like on Wayland without XWayland or on a headless machine.
+
+    >>> desktop = X11Desktop(b":4242")
+    >>> desktop.idle(), desktop.covered()
+    (None, None)
+    >>> desktop.close()
+    """
+
+    _error_handler = None  # Kept alive for as long as the process
+
+    def __init__(self, display=None):
+        """Init class."""
+        self._display = None
+        try:
+            self._xlib = cdll.LoadLibrary("libX11.so.6")
+            self._xss = cdll.LoadLibrary("libXss.so.1")
+        except OSError as reason:
+            return log.debug(reason)
+        xlib = self._xlib
+        xlib.XOpenDisplay.argtypes, xlib.XOpenDisplay.restype = (
+            (c_char_p, ), c_void_p)
+        xlib.XDefaultRootWindow.argtypes = (c_void_p, )
+        xlib.XDefaultRootWindow.restype = c_ulong
+        xlib.XInternAtom.argtypes = (c_void_p, c_char_p, c_int)
+        xlib.XInternAtom.restype = c_ulong
+        xlib.XGetWindowProperty.argtypes = (
+            c_void_p, c_ulong, c_ulong, c_long, c_long, c_int, c_ulong,
+            POINTER(c_ulong), POINTER(c_int), POINTER(c_ulong),
+            POINTER(c_ulong), POINTER(c_void_p))
+        xlib.XFree.argtypes = xlib.XCloseDisplay.argtypes = (c_void_p, )
+        self._xss.XScreenSaverQueryInfo.argtypes = (
+            c_void_p, c_ulong, POINTER(_XScreenSaverInfo))
+        if not X11Desktop._error_handler:  # Windows closed while queried
+            X11Desktop._error_handler = CFUNCTYPE(c_int, c_void_p, c_void_p)(
+                lambda display, event: 0)
+            xlib.XSetErrorHandler(X11Desktop._error_handler)
+        self._display = xlib.XOpenDisplay(display)
+        if self._display:
+            self._root = xlib.XDefaultRootWindow(self._display)
+            self._info = _XScreenSaverInfo()
+            self._atoms = {name: xlib.XInternAtom(self._display, name, 0)
+                           for name in (b"_NET_ACTIVE_WINDOW",
+                                        b"_NET_WM_STATE",
+                                        b"_NET_WM_STATE_FULLSCREEN",
+                                        b"_NET_WM_STATE_MAXIMIZED_VERT",
+                                        b"_NET_WM_STATE_MAXIMIZED_HORZ")}
+
+    def idle(self):
+        """Return seconds without user input and if the screensaver is on."""
+        if not self._display or not self._xss.XScreenSaverQueryInfo(
+                self._display, self._root, byref(self._info)):
+            return None
+        return self._info.idle / 1000.0, self._info.state == 1  # Is On
+
+    def _property(self, window, name):
+        """Return the 32 bit items of a property of a window,as a list."""
+        kind, size, items, left, data = (c_ulong(), c_int(), c_ulong(),
+                                         c_ulong(), c_void_p())
+        if self._xlib.XGetWindowProperty(
+                self._display, window, self._atoms[name], 0, 64, 0, 0,
+                byref(kind), byref(size), byref(items), byref(left),
+                byref(data)) != 0 or not data.value:
+            return []
+        try:  # Items of 32 bits are longs for Xlib,even on 64 bits
+            return list(cast(data, POINTER(c_ulong))[:items.value]) if (
+                size.value == 32) else []
+        finally:
+            self._xlib.XFree(data)
+
+    def covered(self):
+        """Return True if the active window is fullscreen or maximized."""
+        if not self._display:
+            return None
+        active = self._property(self._root, b"_NET_ACTIVE_WINDOW")
+        if not active or not active[0]:
+            return False
+        states, atoms = set(self._property(active[0], b"_NET_WM_STATE")), (
+            self._atoms)
+        return atoms[b"_NET_WM_STATE_FULLSCREEN"] in states or {
+            atoms[b"_NET_WM_STATE_MAXIMIZED_VERT"],
+            atoms[b"_NET_WM_STATE_MAXIMIZED_HORZ"]}.issubset(states)
+
+    def close(self):
+        """Close the connection to the X11 display."""
+        if self._display:
+            self._xlib.XCloseDisplay(self._display)
+        self._display = None
+
+
+class WallpaperThrottle(object):
+
+    """Duty cycle of a wallpaper Game by SIGSTOP and SIGCONT.
+
+    The Game runs a part of each period,depending on the user being idle,
+    the Desktop being hidden and the machine being on battery,any input
+    resumes it at once. CPU time of the Game is accounted per state.
+
+    >>> signals, now, spent = [], [0.0], [0.0]
+    >>> throttle = WallpaperThrottle(0, clock=lambda: now[0], cpu=lambda:
+    ...                              spent[0], send=signals.append)
+    >>> names = lambda: [signal.Signals(signum).name for signum in signals]
+    >>> throttle.update(idle_seconds=0)
+    1.0
+    >>> now[0] = spent[0] = 10.0
+    >>> throttle.update(idle_seconds=120), names()
+    (0.25, [])
+    >>> now[0] = 10.2
+    >>> throttle.tick(), names()
+    (False, ['SIGSTOP'])
+    >>> now[0] = 10.5
+    >>> throttle.tick(), names()
+    (True, ['SIGSTOP', 'SIGCONT'])
+    >>> now[0], spent[0] = 20.0, 12.5
+    >>> throttle.update(120, visible=False), names()[2:]
+    (0.0, ['SIGSTOP'])
+    >>> now[0] = 25.0
+    >>> throttle.update(0), names()[3:]  # Input resumes at once
+    (1.0, ['SIGCONT'])
+    >>> throttle.update(120, battery=True)
+    0.125
+    >>> report = throttle.report()
+    >>> report["active"]["cpu_percent"], report["idle"]["cpu_percent"]
+    (100.0, 25.0)
+    >>> str(throttle).strip()
+    'Wallpaper: idle on battery,12% running,CPU 0.0% (active 100.0%)'
+    """
+
+    def __init__(self, pid, idle_after=THROTTLE_IDLE, period=THROTTLE_PERIOD,
+                 clock=time.monotonic, cpu=None, send=None):
+        """Init class."""
+        self.pid, self.idle_after, self.period = pid, idle_after, period
+        self.clock, self.cpu = clock, cpu or self._cpu_seconds
+        self.send = send or self._signal
+        self.state, self.duty, self.running = "active", 1.0, True
+        self.usage, self._last = {}, (clock(), self.cpu())
+
+    def __str__(self):
+        """Return the state and the CPU usage,for the UI."""
+        report = self.report()
+        return " Wallpaper: {},{:.0%} running,CPU {:.1f}% (active {}) ".format(
+            self.state, self.duty, report.get(self.state, {}).get(
+                "cpu_percent", 0.0), "{:.1f}%".format(report["active"][
+                    "cpu_percent"]) if "active" in report else "?")
+
+    def _signal(self, signum):
+        """Send a signal to the Game and all its descendants."""
+        for pid in [self.pid] + get_child_pids(self.pid):
+            try:
+                os.kill(pid, signum)
+            except OSError:
+                continue  # Finished between the listing and the signal
+
+    def _cpu_seconds(self):
+        """Return the CPU seconds used by the Game and all its descendants."""
+        total = 0.0
+        for pid in [self.pid] + get_child_pids(self.pid):
+            try:
+                total += read_process_stats(pid)["cpu_seconds"]
+            except (OSError, ValueError, IndexError):
+                continue
+        return total
+
+    def _account(self):
+        """Add the wall and CPU seconds since the last call to the state."""
+        now, cpu = self.clock(), self.cpu()
+        usage = self.usage.setdefault(self.state, [0.0, 0.0])
+        usage[0] += now - self._last[0]
+        usage[1] += max(cpu - self._last[1], 0.0)
+        self._last = (now, cpu)
+
+    def update(self, idle_seconds, visible=True, battery=False):
+        """Choose the running part from the user and power,return it."""
+        self._account()
+        activity = "hidden" if not visible else (
+            "idle" if idle_seconds >= self.idle_after else "active")
+        self.state = activity + (" on battery" if battery else "")
+        self.duty = THROTTLE_DUTY[activity] * (
+            THROTTLE_BATTERY if battery else 1.0)
+        self.tick()
+        return self.duty
+
+    def tick(self):
+        """Stop or continue the Game for the current part of the period."""
+        running = self.duty >= 1.0 or (
+            self.clock() % self.period < self.duty * self.period)
+        if running != self.running:
+            self.send(signal.SIGCONT if running else signal.SIGSTOP)
+            self.running = running
+        return running
+
+    def resume(self):
+        """Continue the Game for good,return the report of CPU usage."""
+        self._account()
+        self.duty = 1.0
+        self.send(signal.SIGCONT)
+        self.running = True
+        return self.report()
+
+    def report(self):
+        """Return wall seconds,CPU seconds and CPU percent of each state."""
+        return {state: {"seconds": wall, "cpu_seconds": cpu,
+                        "cpu_percent": round(100.0 * cpu / wall, 1)
+                        if wall else 0.0}
+                for state, (wall, cpu) in self.usage.items()}
+
+
+def benchmark_wallpaper_throttle(duration=2.0):
+    """
+    Benchmark CPU usage of a busy wallpaper Game,active versus throttled.
+
+    The Game is a busy loop,so active uses a whole CPU.
+
+    >>> sorted(benchmark_wallpaper_throttle(0.5))
+    ['active', 'idle', 'idle on battery']
+    """
+    game = Popen((sys.executable, "-c", "while True: pass"))
+    try:
+        throttle = WallpaperThrottle(game.pid)
+        for idle_seconds, battery in ((0.0, False), (THROTTLE_IDLE, False),
+                                      (THROTTLE_IDLE, True)):
+            throttle.update(idle_seconds, battery=battery)
+            finish = time.monotonic() + duration
+            while time.monotonic() < finish:
+                throttle.tick()
+                time.sleep(0.01)
+        results = {state: usage["cpu_percent"]
+                   for state, usage in throttle.resume().items()}
+        log.info("Wallpaper throttle benchmark,CPU percent: {}".format(
+            results))
+        return results
+    finally:
+        game.kill()
+        game.wait()
+
+
+###############################################################################
+
+
+class OutputCapture(object):
+
+    """Streaming capture of the output of BlenderPlayer,on constant memory.
+
+    Chunks are decoded as they arrive,kept on a fixed size ring buffer of
+    lines for the UI,and appended to a log file rotated by size,the disk
+    writes happen on a background thread so the GUI thread never blocks.
+    Lines longer than max_line are split,chunks that do not fit the queue
+    of the writer are dropped and counted,so memory stays bounded.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> capture = OutputCapture(os.path.join(temp_dir, "game.log"), 24, 2, 3)
+    >>> for number in range(9):  # Split chunks on the middle of a character
+    ...     chunk = "línea {}\\n".format(number).encode()
+    ...     _ = capture.feed("stdout", chunk[:2]), capture.feed("stdout",
+    ...                                                         chunk[2:])
+    >>> capture.tail()
+    ['línea 6', 'línea 7', 'línea 8']
+    >>> capture.close()
+    >>> sorted(os.listdir(temp_dir))
+    ['game.log', 'game.log.1', 'game.log.2']
+    >>> capture = OutputCapture(lines=3, max_line=8)
+    >>> _ = capture.feed("stdout", b"." * 20)  # No newline ever
+    >>> capture.tail(), capture._partial
+    (['....................'], {'stdout': ''})
+    >>> shutil.rmtree(temp_dir)
+    """
+
+    def __init__(self, log_file=None, max_bytes=LOG_SIZE,
+                 backups=LOG_BACKUPS, lines=1000, telemetry=None,
+                 max_line=OUTPUT_LINE_MAX, queue_size=OUTPUT_QUEUE_SIZE):
+        """Init class."""
+        self.log_file, self.max_bytes, self.backups = log_file, max_bytes, (
+            backups)
+        self.telemetry, self.max_line, self.dropped = telemetry, max_line, 0
+        self.lines, self.first_output = deque(maxlen=lines), None
+        self._decoders, self._partial = {}, {}
+        self._queue, self._writer = Queue(queue_size), None
+        if log_file:
+            self._writer = threading.Thread(target=self._write_loop,
+                                            name="OutputCapture", daemon=True)
+            self._writer.start()
+
+    def feed(self, stream, data):
+        """Decode a chunk of bytes of a stream, return the text decoded."""
+        if self.first_output is None and data:
+            self.first_output = time.perf_counter()
+        if stream not in self._decoders:
+            self._decoders[stream] = codecs.getincrementaldecoder("utf-8")(
+                "replace")
+        text = self._decoders[stream].decode(bytes(data))
+        self._add_text(stream, text)
+        return text
+
+    def _add_text(self, stream, text):
+        """Add decoded text to the ring buffer and to the writer queue."""
+        if not text:
+            return
+        if self._writer:
+            try:
+                self._queue.put_nowait(text)
+            except Full:  # Disk slower than the Game output,drop it
+                self.dropped += len(text)
+        lines = (self._partial.pop(stream, "") + text).split("\n")
+        self._partial[stream] = lines.pop()
+        if len(self._partial[stream]) > self.max_line:
+            lines.append(self._partial[stream])
+            self._partial[stream] = ""
+        if self.telemetry is not None:
+            lines = [line for line in lines
+                     if not self.telemetry.add_line(line)]
+        self.lines.extend(line.rstrip("\r") for line in lines)
+
+    def tail(self, count=None):
+        """Return the last lines of output, all of the ring buffer if None."""
+        return list(self.lines)[-count:] if count else list(self.lines)
+
+    def _rotate(self, output_file):
+        """Rotate game.log to game.log.1 and so on,return a new game.log."""
+        output_file.close()
+        for number in range(self.backups - 1, 0, -1):
+            older = "{}.{}".format(self.log_file, number)
+            if os.path.isfile(older):
+                os.replace(older, "{}.{}".format(self.log_file, number + 1))
+        if self.backups:
+            os.replace(self.log_file, self.log_file + ".1")
+        return open(self.log_file, "w", encoding="utf-8")
+
+    def _write_loop(self):
+        """Append the queued text to the log file,for the writer thread."""
+        output_file = open(self.log_file, "w", encoding="utf-8")
+        try:
+            while True:
+                text = self._queue.get()
+                if text is None:
+                    break
+                if output_file.tell() and (
+                        output_file.tell() + len(text) > self.max_bytes):
+                    output_file = self._rotate(output_file)
+                output_file.write(text)
+                if self._queue.empty():
+                    output_file.flush()
+        except OSError as reason:
+            log.warning(reason)
+        finally:
+            output_file.close()
+
+    def close(self, timeout=5.0):
+        """Flush the decoders and the pending lines,wait for the writer."""
+        for stream, decoder in self._decoders.items():
+            self._add_text(stream, decoder.decode(b"", True))
+        for stream in list(self._partial):
+            if self._partial[stream]:
+                self.lines.append(self._partial.pop(stream))
+        if self.dropped:
+            log.warning("Dropped {} Characters of output from {}.".format(
+                self.dropped, self.log_file))
+        if self._writer:
+            try:
+                self._queue.put(None, timeout=timeout)
+                self._writer.join(timeout)
+            except Full:
+                pass
+            if self._writer.is_alive():
+                log.warning("Log writer still busy on {}.".format(
+                    self.log_file))
+            self._writer = None
+
+
+###############################################################################
+
+
+class Supervisor(object):
+
+    """Run several BlenderPlayer instances at once,restart them on crash.
+
+    Each instance has its own LaunchOptions,like geometry,CPUs,priority.
+    A crash,non zero exit or signal,restarts it after a backoff that doubles
+    on each crash in a row,giving up after restarts crashes in a row,
+    running stable Seconds forgets previous crashes,clean exits are final.
+    Output is read by threads and queued,poll() never blocks,so a GUI
+    can call it from a timer,max_running limits the instances at once.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> stub = os.path.join(temp_dir, "stub-player")
+    >>> with open(stub, "w") as stub_file:
+    ...     _ = stub_file.write("#!/bin/sh\\necho $2\\nexit $2\\n")
+    >>> os.chmod(stub, 0o755)
+    >>> now = [0.0]
+    >>> supervisor = Supervisor([LaunchOptions(player=stub, samples=samples)
+    ...                          for samples in (2, 4)], "game.blend",
+    ...                         restarts=2, clock=lambda: now[0])
+    >>> supervisor.poll() and supervisor.wait()
+    >>> [instance["status"] for instance in supervisor.instances]
+    ['running', 'running']
+    >>> for now[0] in (0.5, 1.5, 3.5, 5.5, 6.0):
+    ...     _ = supervisor.poll() and supervisor.wait()
+    ...     print([(instance["status"], instance["crashes"])
+    ...            for instance in supervisor.instances])
+    [('backoff', 1), ('backoff', 1)]
+    [('running', 1), ('running', 1)]
+    [('backoff', 2), ('backoff', 2)]
+    [('running', 2), ('running', 2)]
+    [('failed', 3), ('failed', 3)]
+    >>> supervisor.instances[0]["capture"].tail()
+    ['2', '2', '2']
+    >>> with open(stub, "w") as stub_file:
+    ...     _ = stub_file.write("#!/bin/sh\\nexec sleep 9\\n")
+    >>> supervisor = Supervisor([LaunchOptions(player=stub)] * 3,
+    ...                         "game.blend", max_running=2)
+    >>> _ = supervisor.poll()
+    >>> [instance["status"] for instance in supervisor.instances]
+    ['running', 'running', 'waiting']
+    >>> supervisor.stop()
+    >>> [instance["status"] for instance in supervisor.instances]
+    ['stopped', 'stopped', 'stopped']
+    >>> shutil.rmtree(temp_dir)
+    """
+
+    def __init__(self, instances, game_file, max_running=None,
+                 restarts=SUPERVISOR_RESTARTS, backoff=SUPERVISOR_BACKOFF,
+                 stable=SUPERVISOR_STABLE, clock=time.monotonic):
+        """Init class."""
+        self.game_file, self.clock = game_file, clock
+        self.max_running = max_running or len(instances)
+        self.restarts, self.backoff, self.stable = restarts, backoff, stable
+        self.instances = [{
+            "options": options, "process": None, "status": "waiting",
+            "crashes": 0, "starts": 0, "next_start": 0.0, "started": None,
+            "returncode": None, "capture": OutputCapture(lines=100),
+            "reader": None} for options in instances]
+        self._queue = Queue()
+
+    def __str__(self):
+        """Count of instances on each status."""
+        statuses = [instance["status"] for instance in self.instances]
+        return " Instances: {} ".format(", ".join(
+            "{} {}".format(statuses.count(status), status)
+            for status in sorted(set(statuses))))
+
+    def _read(self, index, process):
+        """Queue the output of an instance,for the reader threads."""
+        for data in iter(lambda: process.stdout.read1(CHUNK_SIZE), b""):
+            self._queue.put((index, data))
+        self._queue.put((index, b""))
+
+    def _start(self, index, instance, now):
+        """Start an instance,apply its priority profile."""
+        instance["starts"] += 1
+        instance["started"], instance["returncode"] = now, None
+        try:
+            process = Popen(instance["options"].argv(self.game_file),
+                            stdout=PIPE, stderr=STDOUT)
+        except OSError as reason:
+            log.error("Instance {} can not start: {}".format(index, reason))
+            instance["returncode"] = -1
+            return self._crashed(index, instance, now)
+        try:
+            apply_priority(process.pid, priority_settings(
+                instance["options"]))
+        except OSError as reason:
+            log.debug(reason)  # Not Linux,or exited already
+        instance["process"], instance["status"] = process, "running"
+        instance["reader"] = threading.Thread(
+            target=self._read, args=(index, process), daemon=True,
+            name="Supervisor-{}".format(index))
+        instance["reader"].start()
+
+    def _crashed(self, index, instance, now):
+        """Schedule the restart of a crashed instance,or give up on it."""
+        if now - instance["started"] >= self.stable:
+            instance["crashes"] = 0  # Ran long enough,a new crash streak
+        instance["crashes"] += 1
+        if instance["crashes"] > self.restarts:
+            instance["status"] = "failed"
+            log.error("Instance {} failed {} times in a row,given up."
+                      .format(index, instance["crashes"]))
+            return
+        delay = min(self.backoff[1],
+                    self.backoff[0] * 2 ** (instance["crashes"] - 1))
+        instance["status"], instance["next_start"] = "backoff", now + delay
+        log.warning("Instance {} crashed with {},restart in {} Seconds."
+                    .format(index, instance["returncode"], delay))
+
+    def poll(self):
+        """Read output,reap exits,restart and start instances,never blocks.
+
+        Returns True if any instance is running or will run.
+        """
+        now = self.clock()
+        while not self._queue.empty():
+            index, data = self._queue.get_nowait()
+            self.instances[index]["capture"].feed("stdout", data)
+        for index, instance in enumerate(self.instances):
+            process = instance["process"]
+            if process is None or process.poll() is None:
+                continue
+            instance["process"], instance["returncode"] = None, (
+                process.returncode)
+            if process.returncode == 0:
+                instance["status"] = "exited"
+            else:
+                self._crashed(index, instance, now)
+        running = sum(instance["status"] == "running"
+                      for instance in self.instances)
+        for index, instance in enumerate(self.instances):
+            if running >= self.max_running:
+                break
+            if instance["status"] in ("waiting", "backoff") and (
+                    instance["next_start"] <= now):
+                self._start(index, instance, now)
+                running += instance["status"] == "running"
+        return any(instance["status"] in ("waiting", "backoff", "running")
+                   for instance in self.instances)
+
+    def wait(self, timeout=5):
+        """Wait for the running instances to exit and their output,tests."""
+        for instance in self.instances:
+            if instance["process"]:
+                instance["process"].wait(timeout)
+            if instance["reader"]:
+                instance["reader"].join(timeout)
+        while not self._queue.empty():
+            index, data = self._queue.get_nowait()
+            self.instances[index]["capture"].feed("stdout", data)
+
+    def statuses(self):
+        """Return the status of each instance,for the UI."""
+        now = self.clock()
+        return [{"index": index, "status": instance["status"],
+                 "pid": instance["process"].pid if instance["process"] else
+                 None, "crashes": instance["crashes"],
+                 "starts": instance["starts"], "uptime": now - instance[
+                     "started"] if instance["process"] else 0.0,
+                 "output": (instance["capture"].tail(1) or [""])[0]}
+                for index, instance in enumerate(self.instances)]
+
+    def stop(self, timeout=5):
+        """Terminate all the instances,kill them if they do not exit."""
+        for instance in self.instances:
+            if instance["status"] not in ("exited", "failed"):
+                instance["status"] = "stopped"
+            if instance["process"]:
+                instance["process"].terminate()
+        for instance in self.instances:
+            if instance["process"]:
+                try:
+                    instance["process"].wait(timeout)
+                except TimeoutExpired:
+                    instance["process"].kill()
+                    instance["process"].wait()
+                instance["process"] = None
+
+
+###############################################################################
+
+
+def iter_bench_cells(matrix, base=None):
+    """
+    Yield LaunchOptions for every combination of the settings of a matrix.
+
+    A "resolution" like "1280x720" sets the width and height together.
+
+    >>> cells = list(iter_bench_cells({"samples": [2, 4],
+    ...                                "resolution": ["800x600", "640x480"]}))
+    >>> len(cells), cells[0]
+    (4, LaunchOptions(height=600, samples=2, width=800))
+    """
+    base = base.to_dict() if base else dict(LaunchOptions.DEFAULTS)
+    names = sorted(matrix)
+    for values in product(*(matrix[name] for name in names)):
+        options = dict(base)
+        for name, value in zip(names, values):
+            if name == "resolution":
+                options["width"], options["height"] = str(value).split("x")
+            else:
+                options[name] = value
+        yield LaunchOptions(**options)
+
+
+def run_bench_cell(options, game_file, duration=BENCH_DURATION, cpu=None,
+                   cold=False):
+    """
+    Run BlenderPlayer for duration Seconds,return startup and frame times.
+
+    Startup is the time until the first output,first_frame until the first
+    telemetry sample,cpu pins the player to that core if not None,
+    cold evicts the Game and its libraries from the page cache first.
+    """
+    series, marks = TelemetrySeries(), {}
+    if cold:
+        prefetch_game(game_file, "POSIX_FADV_DONTNEED")
+    started = time.perf_counter()
+    if options.prefetch:
+        threading.Thread(target=prefetch_game, args=(game_file, ),
+                         daemon=True).start()
+    process = Popen(options.argv(game_file), stdout=PIPE, stderr=STDOUT,
+                    env=telemetry_environment())
+    if cpu is not None:  # Not on preexec_fn,it is unsafe with threads
+        try:
+            os.sched_setaffinity(process.pid, {cpu})
+        except OSError as reason:
+            log.warning(reason)
+
+    def read_lines():
+        for line in process.stdout:
+            marks.setdefault("startup", time.perf_counter() - started)
+            if series.add_line(line.decode("utf-8", "replace").strip()):
+                marks.setdefault("first_frame", time.perf_counter() - started)
+
+    reader = threading.Thread(target=read_lines, daemon=True)
+    reader.start()
+    try:
+        returncode = process.wait(duration)
+    except TimeoutExpired:
+        process.terminate()
+        try:
+            process.wait(5)
+        except TimeoutExpired:
+            process.kill()
+            process.wait()
+        returncode = None  # Still running after duration,as expected
+    reader.join(5)
+    summary = series.summary()
+    return {"options": repr(options), "cpu": cpu,
+            "returncode": returncode, "startup": marks.get("startup"),
+            "first_frame": marks.get("first_frame"), "frames": len(series),
+            "frame_time": summary.get("frame_time", {}),
+            "fps": summary.get("fps", {}).get("mean")}
+
+
+def run_bench(options, game_file, matrix=None, duration=BENCH_DURATION,
+              pinned=False, report=None, cold=False):
+    """
+    Sweep a settings matrix running each cell,write a JSON and CSV report.
+
+    Sequential by default,pinned runs one cell per available core at once,
+    cold starts each cell with the Game evicted from the page cache.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> stub = os.path.join(temp_dir, "stub-player")
+    >>> with open(stub, "w") as stub_file:
+    ...     _ = stub_file.write("#!{}\\nimport time\\nprint({!r}, flush=True)"
+    ...         "\\ntime.sleep(9)".format(sys.executable, TELEMETRY_PREFIX +
+    ...                                   json.dumps({"frame_time": 16.6})))
+    >>> os.chmod(stub, 0o755)
+    >>> cells = run_bench(LaunchOptions(player=stub), __file__,
+    ...                   {"samples": [2, 4]}, 0.5, False,
+    ...                   os.path.join(temp_dir, "report"))
+    >>> [(cell["frames"], cell["frame_time"]["mean"]) for cell in cells]
+    [(1, 16.6), (1, 16.6)]
+    >>> sorted(os.listdir(temp_dir))
+    ['report.csv', 'report.json', 'stub-player']
+    >>> shutil.rmtree(temp_dir)
+    """
+    cells = list(iter_bench_cells(matrix or BENCH_MATRIX, options))
+    cpus = sorted(os.sched_getaffinity(0)) if pinned and hasattr(
+        os, "sched_getaffinity") else [None]
+    results = []
+    for first in range(0, len(cells), len(cpus)):
+        batch = cells[first:first + len(cpus)]
+        log.info("Benchmark cells {} to {} of {}.".format(
+            first + 1, first + len(batch), len(cells)))
+        if len(batch) == 1:
+            results.append(run_bench_cell(batch[0], game_file, duration,
+                                          cpus[0], cold))
+            continue
+        with ThreadPoolExecutor(len(batch)) as pool:
+            results.extend(pool.map(lambda cell, cpu: run_bench_cell(
+                cell, game_file, duration, cpu, cold), batch, cpus))
+    if report:
+        with open(report + ".json", "w") as report_json:
+            json.dump({"duration": duration, "pinned": pinned, "cold": cold,
+                       "matrix": matrix or BENCH_MATRIX, "cells": results},
+                      report_json, indent=4)
+        columns = ("options", "cpu", "returncode", "startup", "first_frame",
+                   "frames", "fps")
+        with open(report + ".csv", "w") as report_csv:
+            report_csv.write(",".join(columns + ("frame_time_mean",
+                                                 "frame_time_p95")) + "\n")
+            for cell in results:
+                report_csv.write(",".join(['"{}"'.format(
+                    str(cell[column]).replace('"', "'")) for column in
+                    columns] + [str(cell["frame_time"].get("mean")),
+                                str(cell["frame_time"].get("p95"))]) + "\n")
+        log.info("Benchmark report written to {}.json and .csv".format(
+            report))
+    return results
+
+
+def _tuned_key(game_file):
+    """Return the key of tuned settings,per Game file and per machine."""
+    return "{}|{}|{}".format(platform.node(), platform.machine(),
+                             os.path.abspath(game_file))
+
+
+def load_tuned_settings(game_file):
+    """Return the tuned settings of a Game on this machine,or None."""
+    try:
+        with open(os.path.join(CACHE_DIR, "tuned.json"), "r") as tuned:
+            return json.load(tuned).get(_tuned_key(game_file), {}).get(
+                "settings")
+    except (OSError, ValueError) as reason:
+        log.debug(reason)
+
+
+def save_tuned_settings(game_file, settings, target_fps):
+    """Save the tuned settings of a Game on this machine."""
+    tuned_file, tuned = os.path.join(CACHE_DIR, "tuned.json"), {}
+    try:
+        with open(tuned_file, "r") as tuned_json:
+            tuned = json.load(tuned_json)
+    except (OSError, ValueError) as reason:
+        log.debug(reason)
+    tuned[_tuned_key(game_file)] = {"settings": settings, "fps": target_fps,
+                                    "date": datetime.now().isoformat()}
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(tuned_file + ".tmp", "w") as tuned_json:
+        json.dump(tuned, tuned_json, indent=4, sort_keys=True)
+    os.replace(tuned_file + ".tmp", tuned_file)
+
+
+def apply_tuned_settings(options, game_file=None):
+    """Return options with the tuned settings of the Game,if any."""
+    settings = load_tuned_settings(game_file or options.game)
+    if not settings:
+        return options
+    log.info("Using tuned settings {}.".format(settings))
+    return next(iter_bench_cells({name: [value] for name, value in
+                                  settings.items()}, options))
+
+
+def tune_launch_options(options, target_fps, measure, levels=TUNE_LEVELS):
+    """
+    Search the highest quality settings that sustain target_fps.
+
+    measure(options) returns the 95th percentile frame time in milliseconds
+    or None if it failed,each setting is binary searched from the lowest
+    quality,assuming more quality is never faster,so most of the worse
+    combinations are pruned without running them,returns (settings, trials),
+    settings is None if even the lowest quality misses the target.
+
+    >>> cost = {"640x480": 4, "800x600": 6, "1024x768": 8, "1280x720": 10,
+    ...         "1680x1050": 14, "1920x1080": 18}
+    >>> measure = lambda options: cost["{}x{}".format(
+    ...     options.width, options.height)] + options.samples / 2.0 + (
+    ...     0 if options.blender_material else 3) + (
+    ...     0 if options.no_mipmaps else 0.5)
+    >>> settings, trials = tune_launch_options(LaunchOptions(), 60, measure)
+    >>> settings["resolution"], settings["samples"], trials
+    ('1680x1050', 4, 8)
+    >>> tune_launch_options(LaunchOptions(), 60, lambda options: None)
+    (None, 1)
+    """
+    budget = 1000.0 / target_fps
+    settings = {name: values[0] for name, values in levels}
+    trials = {}
+
+    def sustains(candidate):
+        cell = next(iter_bench_cells({name: [value] for name, value in
+                                      candidate.items()}, options))
+        key = repr(cell)
+        if key not in trials:
+            trials[key] = measure(cell)
+            log.info("Tune trial {} p95 frame time {} ms.".format(
+                key, trials[key]))
+        return trials[key] is not None and trials[key] <= budget
+
+    if not sustains(settings):
+        log.warning("Lowest quality settings can not sustain the target.")
+        return None, len(trials)
+    for name, values in levels:
+        low, high = 0, len(values) - 1  # values[low] is known to sustain
+        while low < high:
+            middle = (low + high + 1) // 2
+            if sustains(dict(settings, **{name: values[middle]})):
+                low = middle
+            else:
+                high = middle - 1
+        settings[name] = values[low]
+    return settings, len(trials)
+
+
+def tune_game(options, game_file, target_fps, duration=BENCH_DURATION):
+    """Tune the settings of a Game with trial runs,persist them if any."""
+
+    def measure(cell):
+        result = run_bench_cell(cell, game_file, duration)
+        return result["frame_time"].get("p95")
+
+    settings, trials = tune_launch_options(options, target_fps, measure)
+    if settings is None:
+        log.error("Can not tune {} for {} FPS,nothing saved.".format(
+            options.game, target_fps))
+        return None
+    save_tuned_settings(options.game, settings, target_fps)
+    log.info("Tuned {} for {} FPS after {} trials: {}".format(
+        options.game, target_fps, trials, settings))
+    return settings
+
+
+def load_instances(options, instances_file=None):
+    """
+    Return LaunchOptions of each instance,from a JSON list of overrides.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> with open(os.path.join(temp_dir, "instances.json"), "w") as json_file:
+    ...     _ = json_file.write('[{"position": "0,0"}, {"cpus": "1"}]')
+    >>> load_instances(LaunchOptions(samples=4), json_file.name)
+    [LaunchOptions(position='0,0', samples=4), LaunchOptions(cpus='1', \
+samples=4)]
+    >>> shutil.rmtree(temp_dir)
+    """
+    if not instances_file:
+        return [options]
+    with open(instances_file, "r") as instances_json:
+        return [LaunchOptions(**dict(options.to_dict(), **instance))
+                for instance in json.load(instances_json)]
+
+
+def supervise(options, game_file, instances_file=None):
+    """Run the instances of a Supervisor without GUI until all finished."""
+    supervisor = Supervisor(load_instances(options, instances_file),
+                            game_file)
+    last = None
+    try:
+        while supervisor.poll():
+            if str(supervisor) != last:
+                last = str(supervisor)
+                log.info(last)
+            time.sleep(0.25)
+    except KeyboardInterrupt:
+        log.info("Stopping all the instances.")
+    finally:
+        supervisor.stop()
+    log.info(supervisor)
+    return int(any(instance["status"] == "failed"
+                   for instance in supervisor.instances))
+
+
+def headless_main():
+    """Run the modes that do not need Qt,before Qt is imported,then exit."""
+    try:
+        opts, args = getopt(sys.argv[1:], "", (
+            "launch=", "bench=", "matrix=", "duration=", "pinned", "cold",
+            "player=", "report=", "tune=", "fps=", "manifest=", "update=",
+            "library", "supervise=", "instances=", "log-level=",
+            "log-json", "trace=", "client=", "detach", "pack="))
+    except GetoptError:
+        return  # Not a headless mode,the GUI handles these options
+    opts = dict(opts)
+    if not {"--launch", "--bench", "--tune", "--manifest", "--update",
+            "--library", "--supervise", "--client", "--pack"}.intersection(
+                opts):
+        return
+    setup_logging(opts.get("--log-level", "INFO").upper(), None,
+                  "--log-json" in opts, threaded=False)  # Before exec
+    if "--launch" in opts:
+        sys.exit(quick_launch(opts["--launch"], *args[:1]))
+    if "--pack" in opts:
+        print(pack_game_container(opts["--pack"], password=read_serial_key(
+            ).encode("utf-8")))
+        sys.exit(0)
+    if "--client" in opts:
+        sys.exit(client_launch(opts["--client"], *args[:1],
+                               detach="--detach" in opts))
+    if "--manifest" in opts:
+        print(write_delta_manifest(opts["--manifest"]))
+        sys.exit(0)
+    if "--library" in opts:
+        library = GameLibrary()
+        for directory in args:
+            library.add_directory(directory)
+        if not args:
+            library.scan()
+        for game in library.games():
+            print("{title}\t{version}\t{scenes}\t{path}".format(**game))
+        print(library)
+        sys.exit(0)
+    if "--update" in opts:
+        try:
+            print(update_game(args[0] if args else GAME_FILE,
+                              opts["--update"]))
+        except (OSError, ValueError) as reason:
+            log.error(reason)
+            sys.exit(1)
+        sys.exit(0)
+    options = LaunchOptions.from_file(opts.get("--bench", opts.get(
+        "--tune", opts.get("--supervise"))))
+    if "--player" in opts:
+        options.player = opts["--player"]
+    matrix = None
+    if "--matrix" in opts:
+        with open(opts["--matrix"], "r") as matrix_file:
+            matrix = json.load(matrix_file)
+    game_file = open_game_headless(options, args[0] if args else None)
+    if not game_file:
+        sys.exit(1)
+    if "--supervise" in opts:
+        sys.exit(supervise(options, game_file, opts.get("--instances")))
+    if "--tune" in opts:
+        if args:
+            options.game = args[0]
+        settings = tune_game(options, game_file,
+                             float(opts.get("--fps", 60)),
+                             float(opts.get("--duration", BENCH_DURATION)))
+        print(settings)
+        sys.exit(0 if settings else 1)
+    for cell in run_bench(
+            options, game_file, matrix,
+            float(opts.get("--duration", BENCH_DURATION)),
+            "--pinned" in opts, opts.get("--report", "bgelauncher-bench"),
+            "--cold" in opts):
+        print("{options} startup={startup} fps={fps}".format(**cell))
+    sys.exit(0)
+
+
+###############################################################################
+
+
+def format_speed(bytes_per_second):
+    """
+    Format a download speed,with precision from KiloBytes to GigaBytes.
+
+    >>> format_speed(512), format_speed(3 * 1024 * 1024)
+    ('0 KiloBytes/Second', '3.0 MegaBytes/Second')
+    """
+    kilobytes = bytes_per_second / 1024
+    if kilobytes > 1024 * 1024:
+        return "{} GigaBytes/Second".format(round(kilobytes / 1024 / 1024, 2))
+    if kilobytes > 1024:
+        return "{} MegaBytes/Second".format(round(kilobytes / 1024, 2))
+    return "{} KiloBytes/Second".format(int(kilobytes))
+
+
+def verify_download(path, size=None, checksum=None, python=False):
+    """
+    Verify a downloaded file,raise ValueError if is truncated or corrupt.
+
+    checksum is the hexadecimal SHA256,python checks it is valid Python.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> path = os.path.join(temp_dir, "bgelauncher.py")
+    >>> with open(path, "w") as script:
+    ...     _ = script.write("print(42)")
+    >>> verify_download(path, 9, hashlib.sha256(b"print(42)").hexdigest())
+    >>> verify_download(path, 99)
+    Traceback (most recent call last):
+    ...
+    ValueError: Truncated download: 9 of 99 Bytes.
+    >>> with open(path, "w") as script:
+    ...     _ = script.write("print(")
+    >>> verify_download(path, python=True)  # doctest: +ELLIPSIS
+    Traceback (most recent call last):
+    ...
+    ValueError: Corrupt download,invalid Python: ...
+    >>> shutil.rmtree(temp_dir)
+    """
+    actual = os.path.getsize(path)
+    if size is not None and actual != size:
+        raise ValueError("Truncated download: {} of {} Bytes.".format(
+            actual, size))
+    if checksum:
+        digest = hashlib.sha256()
+        with open(path, "rb") as downloaded:
+            for chunk in iter(lambda: downloaded.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        if digest.hexdigest() != checksum.lower().split(":")[-1]:
+            raise ValueError("Corrupt download,wrong SHA256 checksum.")
+    if python:
+        with open(path, "rb") as downloaded:
+            try:
+                compile(downloaded.read(), path, "exec")
+            except SyntaxError as reason:
+                raise ValueError("Corrupt download,invalid Python: {}".format(
+                    reason.msg))
+
+
+def parse_checksum(data, url=""):
+    """
+    Return the SHA256 of a published checksum,sha256sum format or just hex.
+
+    >>> parse_checksum(64 * b"A" + b"  app.py\\n") == 64 * "a"
+    True
+    >>> parse_checksum(b"<html>Not Found</html>", "app.py.sha256")
+    Traceback (most recent call last):
+    ...
+    ValueError: Not a SHA256 checksum: app.py.sha256
+    """
+    checksum = (data[:4096].decode("ascii", "replace").split()
+                or [""])[0].lower()
+    if len(checksum) != 64 or set(checksum) - set("0123456789abcdef"):
+        raise ValueError("Not a SHA256 checksum: {}".format(url))
+    return checksum
+
+
+class DownloadSegments(object):
+
+    """Byte ranges of a segmented download,grown while the speed grows.
+
+    Each segment is a list [position, end, received, started],position moves
+    forward as its data is written on its offset of a preallocated file.
+    One more connection is opened by splitting the largest remaining segment,
+    while the total speed keeps growing more than 10% with each new one.
+
+    >>> segments = DownloadSegments(100, minimum=2, maximum=3, min_size=15)
+    >>> segments.pending()
+    [(0, 50), (50, 100)]
+    >>> segments.advance(0, 60)
+    (0, 50)
+    >>> segments.is_done(0), segments.done, segments.received
+    (True, False, 50)
+    >>> segments.adapt(1000.0), segments.pending()
+    (2, [(50, 75), (75, 100)])
+    >>> segments.adapt(1050.0), segments.split()
+    (None, None)
+    >>> DownloadSegments(100, [(20, 30)]).pending()
+    [(20, 30)]
+    """
+
+    __slots__ = ("size", "segments", "maximum", "min_size", "received",
+                 "_speed", "_growing")
+
+    def __init__(self, size, pending=None, minimum=DOWNLOAD_SEGMENTS[0],
+                 maximum=DOWNLOAD_SEGMENTS[1], min_size=SEGMENT_MIN_SIZE):
+        """Split size Bytes in minimum segments,or resume pending ranges."""
+        if pending is None:
+            step = -(-size // max(1, min(minimum, size // min_size)))
+            pending = [(start, min(start + step, size))
+                       for start in range(0, size, step)]
+        started = time.time()
+        self.size, self.maximum, self.min_size = size, maximum, min_size
+        self.segments = [[start, end, 0, started]
+                         for start, end in pending if start < end]
+        self.received, self._speed, self._growing = 0, 0.0, True
+
+    def pending(self):
+        """Return the (start, end) ranges still to download,to resume later."""
+        return [(position, end) for position, end, _, _ in self.segments
+                if position < end]
+
+    def advance(self, index, size):
+        """Advance a segment by size Bytes,return (offset, Bytes to write).
+
+        Data past the end of a segment belongs to the one split from it.
+        """
+        segment = self.segments[index]
+        offset, size = segment[0], min(size, max(segment[1] - segment[0], 0))
+        segment[0] += size
+        segment[2] += size
+        self.received += size
+        return offset, size
+
+    def is_done(self, index):
+        """Return True if a segment is complete."""
+        return self.segments[index][0] >= self.segments[index][1]
+
+    @property
+    def done(self):
+        """Return True if all segments are complete."""
+        return not self.pending()
+
+    def speeds(self):
+        """Return the Bytes per Second of each active segment."""
+        now = time.time()
+        return [received / max(now - started, 0.001)
+                for position, end, received, started in self.segments
+                if position < end]
+
+    def split(self):
+        """Split the largest remaining segment,return the new index or None."""
+        if len(self.pending()) >= self.maximum:
+            return None
+        largest = max(self.segments, key=lambda segment: (
+            segment[1] - segment[0]))
+        if largest[1] - largest[0] < 2 * self.min_size:
+            return None
+        middle = (largest[0] + largest[1]) // 2
+        self.segments.append([middle, largest[1], 0, time.time()])
+        largest[1] = middle
+        return len(self.segments) - 1
+
+    def adapt(self, speed):
+        """Open one more segment while the speed grows,return its index."""
+        self._growing = self._growing and speed > self._speed * 1.1
+        self._speed = max(speed, self._speed)
+        return self.split() if self._growing else None
+
+
+###############################################################################
+
+
+def make_delta_manifest(game_file, block_size=DELTA_BLOCK_SIZE):
+    """
+    Hash a Game by fixed size blocks,the manifest published for its updates.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> game_file = os.path.join(temp_dir, "game.blend")
+    >>> with open(game_file, "wb") as game:
+    ...     _ = game.write(b"a" * 10 + b"b" * 10 + b"c" * 5)
+    >>> manifest = make_delta_manifest(game_file, 10)
+    >>> manifest["size"], len(manifest["blocks"]), manifest["block_size"]
+    (25, 3, 10)
+    >>> shutil.rmtree(temp_dir)
+    """
+    blocks, digest = [], hashlib.sha256()
+    with open(game_file, "rb") as game:
+        for block in iter(lambda: game.read(block_size), b""):
+            digest.update(block)
+            blocks.append(hashlib.sha256(block).hexdigest()[:32])
+    return {"size": os.path.getsize(game_file), "block_size": block_size,
+            "sha256": digest.hexdigest(), "blocks": blocks}
+
+
+def write_delta_manifest(game_file, block_size=DELTA_BLOCK_SIZE):
+    """Write the manifest of a Game next to it,to publish both together."""
+    manifest_file = game_file + MANIFEST_EXT
+    with open(manifest_file, "w") as manifest:
+        json.dump(make_delta_manifest(game_file, block_size), manifest)
+    return manifest_file
+
+
+def plan_delta_update(game_file, manifest):
+    """
+    Plan the update of a local Game to the one described by a manifest.
+
+    Returns (copies, ranges),copies maps each block index to the offset of
+    an identical block on the local Game,ranges are the (start, end) bytes
+    to download,near ranges are merged to save HTTP requests.
+    Local blocks are matched at block aligned offsets only,data shifted by
+    an insertion is downloaded again,the price of not rolling checksums.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> game_file = os.path.join(temp_dir, "game.blend")
+    >>> with open(game_file, "wb") as game:
+    ...     _ = game.write(b"".join(bytes([i]) * 10 for i in range(6)))
+    >>> manifest = make_delta_manifest(game_file, 10)
+    >>> with open(game_file, "r+b") as game:
+    ...     _ = game.write(b"x")
+    >>> plan_delta_update(game_file, manifest)[1]
+    [(0, 10)]
+    >>> manifest["blocks"][4] = manifest["blocks"][5] = "changed"
+    >>> copies, ranges = plan_delta_update(game_file, manifest)
+    >>> sorted(copies), ranges
+    ([1, 2, 3], [(0, 10), (40, 60)])
+    >>> shutil.rmtree(temp_dir)
+    """
+    block_size, size = manifest["block_size"], manifest["size"]
+    local = {}
+    if os.path.isfile(game_file):
+        for index, block_hash in enumerate(
+                make_delta_manifest(game_file, block_size)["blocks"]):
+            local.setdefault(block_hash, index * block_size)
+    copies, ranges = {}, []
+    for index, block_hash in enumerate(manifest["blocks"]):
+        if block_hash in local:
+            copies[index] = local[block_hash]
+            continue
+        start = index * block_size
+        end = min(start + block_size, size)
+        if ranges and start - ranges[-1][1] <= block_size * DELTA_MAX_GAP:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return copies, ranges
+
+
+def _fetch_range(url, start, end, fd):
+    """Download bytes start to end of url to the same offset of fd."""
+    ranged = request.Request(url, headers={
+        "Range": "bytes={}-{}".format(start, end - 1)})
+    with request.urlopen(ranged, timeout=30) as response:
+        if response.status != 206:  # Range ignored,the whole file is coming
+            start = 0
+        offset = start
+        for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+            offset += os.pwrite(fd, chunk, offset)
+        return offset - start, response.status == 206
+
+
+def update_game(game_file, url, manifest=None, min_size=SEGMENT_MIN_SIZE):
+    """
+    Update a local Game to the published at url,download changed blocks only.
+
+    manifest defaults to the one published at url plus MANIFEST_EXT.
+    When every kept block stays at its offset the Game is patched in place,
+    otherwise it is rebuilt on a .part file,either way it is verified with
+    the SHA256 of the manifest,returns a dict with the transfer statistics.
+    A missing local Game is downloaded whole,big ranges are split on
+    segments of at least min_size Bytes downloaded over several connections.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> mirror = serve_directory(temp_dir)
+    >>> published = os.path.join(temp_dir, "game.blend")
+    >>> data = b"".join(struct.pack(">I", i) for i in range(65536))
+    >>> with open(published, "wb") as game:
+    ...     _ = game.write(data)
+    >>> _ = write_delta_manifest(published, 4096)
+    >>> local = os.path.join(temp_dir, "local.blend")
+    >>> with open(local, "wb") as game:
+    ...     _ = game.write(b"old" + data[3:] + b"tail")
+    >>> url = "http://127.0.0.1:{}/game.blend".format(mirror.server_port)
+    >>> stats = update_game(local, url)
+    >>> stats["downloaded"], stats["reused"], stats["inplace"]
+    (4096, 258048, True)
+    >>> open(local, "rb").read() == open(published, "rb").read()
+    True
+    >>> update_game(local, url)["downloaded"]
+    0
+    >>> fresh = os.path.join(temp_dir, "fresh.blend")
+    >>> stats = update_game(fresh, url, min_size=65536)
+    >>> stats["downloaded"], stats["requests"]
+    (262144, 2)
+    >>> open(fresh, "rb").read() == open(published, "rb").read()
+    True
+    >>> mirror.shutdown()
+    >>> shutil.rmtree(temp_dir)
+    """
+    started = time.perf_counter()
+    if manifest is None:
+        with request.urlopen(url + MANIFEST_EXT, timeout=30) as response:
+            manifest = json.loads(response.read().decode("utf-8"))
+    block_size, size = manifest["block_size"], manifest["size"]
+    copies, ranges = plan_delta_update(game_file, manifest)
+    inplace = all(offset == index * block_size
+                  for index, offset in copies.items())
+    target = game_file if inplace else game_file + ".part"
+    fd = os.open(target, os.O_WRONLY | os.O_CREAT, 0o644)
+    downloaded = 0
+    try:
+        if not inplace:
+            with open(game_file, "rb") as local:
+                for index, offset in sorted(copies.items()):
+                    local.seek(offset)
+                    os.pwrite(fd, local.read(min(
+                        block_size, size - index * block_size)),
+                        index * block_size)
+        ranges = [(start + first, start + last) for start, end in ranges
+                  for first, last in DownloadSegments(
+                      end - start, min_size=min_size).pending()]
+        if ranges:  # The first one tells if the server can send ranges
+            downloaded, ranged = _fetch_range(url, *ranges[0], fd)
+            if not ranged:
+                log.warning("Server can not send ranges,downloaded it all.")
+            elif len(ranges) > 1:
+                with ThreadPoolExecutor(DOWNLOAD_SEGMENTS[1]) as pool:
+                    downloaded += sum(received for received, _ in pool.map(
+                        lambda segment: _fetch_range(url, *segment, fd),
+                        ranges[1:]))
+        os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+    try:
+        verify_download(target, size, manifest["sha256"])
+    except ValueError:
+        if not inplace:
+            os.remove(target)
+        raise
+    if not inplace:
+        os.replace(target, game_file)
+    stats = {"size": size, "downloaded": downloaded, "inplace": inplace,
+             "reused": sum(min(block_size, size - index * block_size)
+                           for index in copies),
+             "requests": len(ranges), "seconds": time.perf_counter() - started,
+             "saved": round(100.0 - 100.0 * downloaded / size, 2) if size
+             else 100.0}
+    log.info("Game updated,downloaded {} of {} Bytes,saved {}% bandwidth."
+             .format(downloaded, size, stats["saved"]))
+    return stats
+
+
+class _RangeRequestHandler(SimpleHTTPRequestHandler):
+
+    """Static HTTP server of a folder that honors single Range requests."""
+
+    def send_head(self):
+        """Send a 206 Partial Content head when a byte Range is requested."""
+        ranged = self.headers.get("Range", "")
+        path = self.translate_path(self.path)
+        if not ranged.startswith("bytes=") or not os.path.isfile(path):
+            return super(_RangeRequestHandler, self).send_head()
+        size = os.path.getsize(path)
+        start, end = ranged[6:].split(",")[0].split("-")
+        start, end = int(start), min(int(end or size - 1), size - 1)
+        with open(path, "rb") as served:
+            served.seek(start)
+            body = BytesIO(served.read(end - start + 1))
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Range", "bytes {}-{}/{}".format(
+            start, end, size))
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return body
+
+    def copyfile(self, source, outputfile):
+        """Send the body,cut it half way while the server has cuts left."""
+        with self.server.cuts_lock:
+            cut, self.server.cuts = self.server.cuts > 0, max(
+                self.server.cuts - 1, 0)
+        if not cut:
+            return super(_RangeRequestHandler, self).copyfile(
+                source, outputfile)
+        data = source.read()
+        outputfile.write(data[:len(data) // 2])
+        self.close_connection = True  # Less than Content-Length,truncated
+
+    def end_headers(self):
+        """Advertise the Range support on every response."""
+        self.send_header("Accept-Ranges", "bytes")
+        super(_RangeRequestHandler, self).end_headers()
+
+    def log_message(self, message, *args):
+        """Log requests to the debug log,not to stderr."""
+        log.debug(message % args)
+
+
+def serve_directory(directory, port=0, cuts=0):
+    """
+    Serve a folder over HTTP with Range support,a local Game mirror.
+
+    The first cuts responses are cut half way,to test resumed downloads.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(
+        _RangeRequestHandler, directory=directory))
+    server.cuts, server.cuts_lock = cuts, threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def benchmark_delta_update(size=64 * 1024 * 1024, changed=4):
+    """
+    Benchmark a delta update of a Game against downloading it whole.
+
+    A few blocks change,the Game is served by a local HTTP mirror.
+
+    >>> sorted(benchmark_delta_update(1024 * 1024, 2))
+    ['delta', 'full', 'saved']
+    """
+    temp_dir = mkdtemp(prefix="bgelauncher-")
+    mirror = serve_directory(temp_dir)
+    try:
+        published = os.path.join(temp_dir, "game.blend")
+        with open(published, "wb") as game:
+            game.write(os.urandom(size))
+        block_size = min(DELTA_BLOCK_SIZE, size // 16)
+        write_delta_manifest(published, block_size)
+        local = os.path.join(temp_dir, "local.blend")
+        shutil.copyfile(published, local)
+        with open(local, "r+b") as game:
+            for block in range(changed):
+                game.seek(block * size // changed)
+                game.write(b"changed")
+        url = "http://127.0.0.1:{}/game.blend".format(mirror.server_port)
+        results = {}
+        started = time.perf_counter()
+        request.urlretrieve(url, os.path.join(temp_dir, "full.blend"))
+        results["full"] = time.perf_counter() - started
+        stats = update_game(local, url)
+        results["delta"], results["saved"] = stats["seconds"], stats["saved"]
+        log.info("Delta update benchmark: {}".format(results))
+        return results
+    finally:
+        mirror.shutdown()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+###############################################################################
+
+
+def send_launch_request(request, socket_file=RESIDENT_SOCKET, timeout=None):
+    """Send a request to the resident launcher,yield its JSON replies."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(timeout)
+        client.connect(socket_file)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("r", encoding="utf-8") as replies:
+            for line in replies:
+                yield json.loads(line)
+    finally:
+        client.close()
+
+
+def ping_resident(socket_file=RESIDENT_SOCKET, timeout=1.0):
+    """
+    Return the PID of the resident launcher,or None if not running.
+
+    >>> ping_resident(os.path.join(gettempdir(), "no-bgelauncher.sock"))
+    """
+    try:
+        return next(send_launch_request({"ping": True}, socket_file,
+                                        timeout))["pong"]
+    except (OSError, StopIteration, ValueError, KeyError):
+        return None
+
+
+def client_launch(profile_file, game_file=None, detach=False,
+                  socket_file=RESIDENT_SOCKET):
+    """
+    Launch a Game on the resident launcher,return the exit code of Game.
+
+    The Game can be a file or a title on the Game Library,without a
+    resident launcher it fallbacks to a quick launch.
+    """
+    request = {"profile": os.path.abspath(profile_file), "game": (
+        os.path.abspath(game_file) if game_file and os.path.exists(
+            game_file) else game_file), "detach": detach}
+    if game_file and game_file.lower().endswith((".zip", CONTAINER_EXT)):
+        request["password"] = read_serial_key()
+    try:
+        for reply in send_launch_request(request, socket_file):
+            if "error" in reply:
+                log.error(reply["error"])
+                return 1
+            if "pid" in reply:
+                print("PID {}".format(reply["pid"]), flush=True)
+                if detach:
+                    return 0
+            if "exit" in reply:
+                log.info("Game exited with {}.".format(reply["exit"]))
+                return reply["exit"]
+    except (ConnectionError, FileNotFoundError) as reason:
+        log.warning("No resident launcher on {} ({}),launching cold.".format(
+            socket_file, reason))
+        return quick_launch(profile_file, game_file)
+    log.error("Resident launcher closed the connection.")
+    return 1
+
+
+def benchmark_resident():
+    """
+    Benchmark request to spawn latency,resident launcher against cold start.
+
+    Cold is a whole --launch,resident is a request until the PID reply,
+    client is the same request from the --client CLI,a new process.
+    The player is /bin/true.
+
+    >>> sorted(benchmark_resident())
+    ['client', 'cold', 'resident']
+    """
+    temp_dir, daemon, listening = mkdtemp(prefix="bgelauncher-"), None, False
+    socket_file = os.path.join(temp_dir, "bgelauncher.sock")
+    environment = dict(os.environ, XDG_RUNTIME_DIR=temp_dir,
+                       QT_QPA_PLATFORM="offscreen")
+    try:
+        game_file = os.path.join(temp_dir, "game.blend")
+        open(game_file, "wb").close()
+        profile_file = LaunchOptions(game=game_file, player="true").to_file(
+            os.path.join(temp_dir, "profile.json"))
+        command, results = (sys.executable, os.path.abspath(__file__)), {}
+        started = time.perf_counter()
+        call(command + ("--launch", profile_file, game_file), env=environment)
+        results["cold"] = time.perf_counter() - started
+        daemon = Popen(command + ("--resident", ), env=environment)
+        deadline = time.monotonic() + 60
+        while not listening:
+            if time.monotonic() > deadline or daemon.poll() is not None:
+                raise OSError("Resident launcher did not start.")
+            time.sleep(0.1)
+            listening = ping_resident(socket_file)
+        started = time.perf_counter()
+        for reply in send_launch_request({"profile": profile_file,
+                                          "game": game_file}, socket_file):
+            if "pid" in reply or "error" in reply:
+                break
+        results["resident"] = time.perf_counter() - started
+        started = time.perf_counter()
+        call(command + ("--client", profile_file, "--detach", game_file),
+             env=environment)
+        results["client"] = time.perf_counter() - started
+        log.info("Resident launcher benchmark: {}".format(results))
+        return results
+    finally:
+        if daemon:
+            try:
+                if listening:
+                    list(send_launch_request({"quit": True}, socket_file, 5))
+            except OSError as reason:
+                log.warning(reason)
+            try:
+                daemon.wait(10)
+            except TimeoutExpired:
+                daemon.kill()
+                daemon.wait()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+BENCHMARKS = (benchmark_logging, benchmark_tracer, benchmark_extraction,
+              benchmark_diskless, benchmark_container, benchmark_version_probe,
+              benchmark_quick_launch, benchmark_delta_update,
+              benchmark_prefetch, benchmark_library,
+              benchmark_compressed_blend, benchmark_wallpaper_throttle,
+              benchmark_resident)
+
+
+if __name__ in '__main__':
+    if get_trace_file(sys.argv):  # Before importing Qt,to trace it too
+        TRACER.start(get_trace_file(sys.argv))
+    headless_main()  # Exits when headless, before importing Qt.
+
+
+# Qt imports,after the headless modes so those never pay for importing Qt.
+_qt_imports = time.perf_counter()
+from PyQt5.QtCore import (QDir, QFile, QFileInfo,  # noqa: E402
+                          QIODevice, QProcess, QProcessEnvironment, QSize, Qt,
+                          QTimer, QUrl)
+from PyQt5.QtGui import QCursor, QIcon  # noqa: E402
+from PyQt5.QtNetwork import (QLocalServer,  # noqa: E402
+                             QLocalSocket, QNetworkAccessManager,
+                             QNetworkProxyFactory, QNetworkRequest)
+from PyQt5.QtWidgets import (QApplication, QCheckBox,  # noqa: E402
+                             QComboBox, QDialog, QDialogButtonBox,
+                             QFileDialog, QFontDialog, QGridLayout, QGroupBox,
+                             QHBoxLayout, QInputDialog, QLabel, QMainWindow,
+                             QMenu, QMessageBox, QProgressBar,
+                             QProgressDialog, QShortcut, QSpinBox,
+                             QSystemTrayIcon, QVBoxLayout, QWidget)
+TRACER.add("qt imports", _qt_imports)
 
 
 ###############################################################################
@@ -60,16 +4208,74 @@ PASSWORD = ""
 
 class Downloader(QProgressDialog):
 
-    """Downloader Dialog with complete informations and progress bar."""
+    """Downloader Dialog with complete informations and progress bar.
 
-    def __init__(self, parent=None):
+    Data is streamed to a .part file as it arrives,an interrupted download
+    is resumed with a HTTP Range request,the file is verified (size,SHA256
+    checksum if given,Python syntax for .py) before an atomic rename.
+    Big files are downloaded on segments over several connections,written
+    on their offsets of a preallocated .part,pending ranges on .part.json.
+    Quiet shows no message boxes,for tests.
+
+    >>> temp_dir = mkdtemp(prefix="bgelauncher-")
+    >>> mirror = serve_directory(temp_dir, cuts=1)
+    >>> url = "http://127.0.0.1:{}/".format(mirror.server_port)
+    >>> for name, data in (("small.py", b"#" * 1024 * 1024), ("big.bin",
+    ...                    os.urandom(2 * SEGMENT_MIN_SIZE))):
+    ...     with open(os.path.join(temp_dir, name), "wb") as published:
+    ...         _ = published.write(data)
+    >>> def checksum(name):
+    ...     with open(os.path.join(temp_dir, name), "rb") as downloaded:
+    ...         return hashlib.sha256(downloaded.read()).hexdigest()
+    >>> small = os.path.join(temp_dir, "small.copy.py")
+    >>> Downloader(None, url + "small.py", small, checksum("small.py"),
+    ...            quiet=True).succeeded  # Cut,the .part is kept
+    False
+    >>> os.path.getsize(small + ".part")
+    524288
+    >>> with socket.socket() as unused:  # Nothing listens there after
+    ...     unused.bind(("127.0.0.1", 0))
+    ...     refused = "http://127.0.0.1:{}/".format(unused.getsockname()[1])
+    >>> [Downloader(None, mirror_url + "small.py", small, quiet=True
+    ...             ).succeeded for mirror_url in (refused, url + "404/")]
+    [False, False]
+    >>> os.path.getsize(small + ".part")  # Refused resumes keep the .part
+    524288
+    >>> Downloader(None, url + "small.py", small, checksum("small.py"),
+    ...            quiet=True).succeeded  # Resumed with a Range request
+    True
+    >>> checksum("small.copy.py") == checksum("small.py")
+    True
+    >>> mirror.cuts = 2  # Both first segments are cut,and retried
+    >>> big = os.path.join(temp_dir, "big.copy.bin")
+    >>> Downloader(None, url + "big.bin", big, checksum("big.bin"),
+    ...            quiet=True).succeeded, os.path.exists(big + ".part")
+    (True, False)
+    >>> Downloader(None, url + "big.bin", big, 64 * "0",
+    ...            quiet=True).succeeded  # Wrong checksum,not renamed
+    False
+    >>> checksum("big.copy.bin") == checksum("big.bin")
+    True
+    >>> mirror.shutdown()
+    >>> shutil.rmtree(temp_dir)
+    """
+
+    def __init__(self, parent=None, url=__source__, destination=__file__,
+                 checksum=None, quiet=False):
         """Init class."""
         super(Downloader, self).__init__(parent)
+        self.quiet = quiet
         self.setWindowTitle(__doc__)
         if not os.path.isfile(__file__) or not __source__:
             self.close()
         self._time, self._date = time.time(), datetime.now().isoformat()[:-7]
-        self._url, self._dst = __source__, __file__
+        self._url, self._dst, self._checksum = url, destination, checksum
+        self._part = self._dst + ".part"
+        self._offset = os.path.getsize(self._part) if os.path.isfile(
+            self._part) and not os.path.isfile(self._part + ".json") else 0
+        self._output, self.succeeded, self._canceled = None, False, False
+        self._segments, self._replies, self._retries = None, {}, {}
+        self._fd, self._window = None, (0, self._time)
         log.debug("Downloading from {} to {}.".format(self._url, self._dst))
         if not self._url.lower().startswith("https:"):
             log.warning("Unsecure Download over plain text without SSL.")
@@ -83,30 +4289,221 @@ class Downloader(QProgressDialog):
         <tr><td><b>Received:</b></td>  <td>{} MegaBytes</td>
         <tr><td><b>Total:</b></td>     <td>{} MegaBytes</td> <tr>
         <tr><td><b>Speed:</b></td>     <td>{}</td>
-        <tr><td><b>Percent:</b></td>     <td>{}%</td></table><hr>"""
+        <tr><td><b>Percent:</b></td>     <td>{}%</td> <tr>
+        <tr><td><b>Segments:</b></td>  <td>{}</td></table><hr>"""
         self.manager = QNetworkAccessManager(self)
-        self.manager.finished.connect(self.save_downloaded_data)
         self.manager.sslErrors.connect(self.download_failed)
-        self.progreso = self.manager.get(QNetworkRequest(QUrl(self._url)))
-        self.progreso.downloadProgress.connect(self.update_download_progress)
+        self.canceled.connect(self.cancel_download)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.update_segments_progress)
+        self.progreso = self.manager.head(QNetworkRequest(QUrl(self._url)))
+        self.progreso.finished.connect(self.start_download)
         self.show()
         self.exec_()
 
-    def save_downloaded_data(self, data):
-        """Save all downloaded data to the disk and quit."""
+    def start_download(self):
+        """Start on segments if the server supports ranges,else one stream."""
+        head, self.progreso = self.progreso, None
+        head.deleteLater()
+        length = head.header(QNetworkRequest.ContentLengthHeader)
+        if self._canceled:
+            return
+        if not head.error() and length and int(length) >= (
+                2 * SEGMENT_MIN_SIZE) and bytes(
+                head.rawHeader(b"Accept-Ranges")).strip() == b"bytes":
+            return self.start_segments(int(length))
+        network_request = QNetworkRequest(QUrl(self._url))
+        if self._offset:
+            log.info("Resuming download from {} Bytes.".format(self._offset))
+            network_request.setRawHeader(b"Range", "bytes={}-".format(
+                self._offset).encode())
+        self.progreso = self.manager.get(network_request)
+        self.progreso.readyRead.connect(self.save_downloaded_chunk)
+        self.progreso.finished.connect(self.save_downloaded_data)
+        self.progreso.downloadProgress.connect(self.update_download_progress)
+
+    def start_segments(self, size):
+        """Preallocate the .part and download it on segments."""
+        pending = None
+        try:
+            with open(self._part + ".json", "r") as pending_file:
+                resumed = json.load(pending_file)
+            if resumed["size"] == size and resumed["url"] == self._url:
+                pending = resumed["pending"]
+        except (OSError, ValueError, KeyError) as reason:
+            log.debug(reason)
+        self._segments = DownloadSegments(size, pending)
+        self._offset = size - sum(end - start for start, end in (
+            self._segments.pending()))
+        log.info("Downloading {} Bytes on {} segments,{} Bytes done.".format(
+            size, len(self._segments.segments), self._offset))
+        self._fd = os.open(self._part, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.posix_fallocate(self._fd, 0, size)
+        except (AttributeError, OSError):  # Not on all platforms and FS
+            os.ftruncate(self._fd, size)
+        self.save_pending_segments()
+        for index in range(len(self._segments.segments)):
+            self.request_segment(index)
+        self.timer.start(500)
+
+    def request_segment(self, index):
+        """Request the remaining range of a segment on its own connection."""
+        if self._canceled or self._segments.is_done(index):
+            return
+        start, end = self._segments.segments[index][:2]
+        network_request = QNetworkRequest(QUrl(self._url))
+        network_request.setRawHeader(b"Range", "bytes={}-{}".format(
+            start, end - 1).encode())
+        reply = self.manager.get(network_request)
+        reply.readyRead.connect(self.save_segment_chunk)
+        reply.finished.connect(self.segment_finished)
+        self._replies[reply] = index
+
+    def save_segment_chunk(self):
+        """Write the data received by a segment on its offset of the .part."""
+        reply = self.sender()
+        index = self._replies.get(reply)
+        if index is None or reply.attribute(
+                QNetworkRequest.HttpStatusCodeAttribute) != 206:
+            return reply.abort()
+        data = bytes(reply.readAll())
+        offset, size = self._segments.advance(index, len(data))
+        self._retries.pop(index, None)  # Progress,retry again if it fails
+        os.pwrite(self._fd, memoryview(data)[:size], offset)
+        if self._segments.is_done(index) and reply.isRunning():
+            reply.abort()  # The rest of the range was split to other segment
+
+    def segment_finished(self):
+        """Retry a failed segment,finish when all the segments are done."""
+        reply = self.sender()
+        index = self._replies.pop(reply, None)
+        reply.deleteLater()
+        if index is None or self._canceled or self._fd is None:
+            return
+        if not self._segments.is_done(index):
+            self._retries[index] = self._retries.get(index, 0) + 1
+            status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            if status not in (206, None):
+                return self.stop_segments("Server can not send ranges: HTTP "
+                                          "{}".format(status))
+            if self._retries[index] > SEGMENT_RETRIES:
+                return self.stop_segments(reply.errorString())
+            log.warning("Segment {} failed,retry {} of {}: {}".format(
+                index, self._retries[index], SEGMENT_RETRIES,
+                reply.errorString()))
+            return QTimer.singleShot(1000 * 2 ** self._retries[index],
+                                     partial(self.request_segment, index))
+        index = self._segments.split()  # Keep the connection count
+        if index is not None:
+            self.request_segment(index)
+        if self._segments.done:
+            self.stop_segments()
+            self.finish_download(self._segments.size)
+
+    def stop_segments(self, download_error=None):
+        """Stop a segmented download,keep pending ranges to resume later."""
+        self.timer.stop()
+        for reply in list(self._replies):
+            self._replies.pop(reply)
+            reply.abort()
+        os.close(self._fd)
+        self._fd = None
+        if self._segments.done:
+            os.remove(self._part + ".json")
+        else:
+            self.save_pending_segments()
+            log.warning("Download interrupted,.part kept to resume.")
+        if download_error is not None:
+            self.download_failed(download_error)
+            self.close()
+
+    def save_pending_segments(self):
+        """Save the pending ranges of a segmented download on .part.json."""
+        with open(self._part + ".json", "w") as pending_file:
+            json.dump({"url": self._url, "size": self._segments.size,
+                       "pending": self._segments.pending()}, pending_file)
+
+    def update_segments_progress(self):
+        """Update the UI,adapt the segments and save the pending ranges."""
+        self.update_download_progress(
+            self._segments.received, self._segments.size - self._offset)
+        now = time.time()
+        if now - self._window[1] >= 2.0:
+            index = self._segments.adapt((
+                self._segments.received - self._window[0]) / (
+                now - self._window[1]))
+            self._window = (self._segments.received, now)
+            if index is not None:
+                log.info("Throughput grows,opening segment {}.".format(index))
+                self.request_segment(index)
+            self.save_pending_segments()
+
+    def cancel_download(self):
+        """Stop the download,keeping the .part to resume later."""
+        self._canceled = True
+        if self._fd is not None:
+            self.stop_segments()
+        elif self.progreso is not None:
+            self.progreso.abort()
+
+    def save_downloaded_chunk(self):
+        """Append the data received to the .part file, as it arrives."""
+        if self._output is None:
+            status = self.progreso.attribute(
+                QNetworkRequest.HttpStatusCodeAttribute)
+            if status not in (200, 206) or self.progreso.error() and (
+                    not self.progreso.bytesAvailable()):
+                return  # Refused or an error page,the .part is kept as is
+            if self._offset and status != 206:  # Server ignored the Range
+                log.warning("Server can not resume, downloading from zero.")
+                self._offset = 0
+            self._output = open(self._part, "ab" if self._offset else "wb")
+        self._output.write(bytes(self.progreso.readAll()))
+
+    def save_downloaded_data(self):
+        """Verify the downloaded data,rename it to destination and quit."""
+        self.save_downloaded_chunk()
+        if self._output is None or self.progreso.error():
+            if self._output is not None:
+                self._output.close()
+            if os.path.isfile(self._part):
+                log.warning("Download interrupted,.part kept to resume.")
+            if not self._canceled:
+                self.download_failed(self.progreso.errorString())
+            return self.close()
+        self._output.close()
+        length = self.progreso.header(QNetworkRequest.ContentLengthHeader)
+        self.progreso.deleteLater()
+        self.finish_download(self._offset + int(length)
+                             if length is not None else None)
+
+    def finish_download(self, size):
+        """Verify the .part,rename it to destination and quit."""
+        try:
+            verify_download(self._part, size, self._checksum,
+                            self._dst.endswith(".py"))
+        except ValueError as reason:
+            if size is not None and os.path.getsize(self._part) < size:
+                log.warning("Download interrupted,.part kept to resume.")
+            else:  # Corrupt,nothing to resume
+                os.remove(self._part)
+            self.download_failed(reason)
+            return self.close()
+        os.replace(self._part, self._dst)
+        self.succeeded = True
         log.debug("Download done. Update Done.")
-        with open(os.path.join(self._dst), "wb") as output_file:
-            output_file.write(data.readAll())
-        data.close()
-        QMessageBox.information(self, __doc__.title(),
-                                "<b>You got the latest version of this App!")
-        del self.manager, data
+        if not self.quiet:
+            QMessageBox.information(
+                self, __doc__.title(),
+                "<b>You got the latest version of this App!")
         return self.close()
 
     def download_failed(self, download_error):
         """Handle a download error, probable SSL errors."""
         log.error(download_error)
-        QMessageBox.error(self, __doc__.title(), str(download_error))
+        if not self.quiet:
+            QMessageBox.warning(self, __doc__.title(), str(download_error))
 
     def seconds_time_to_human_string(self, time_on_seconds=0):
         """Calculate time, with precision from seconds to days."""
@@ -125,49 +4522,166 @@ class Downloader(QProgressDialog):
 
     def update_download_progress(self, bytesReceived, bytesTotal):
         """Calculate statistics and update the UI with them."""
-        downloaded_MB = round(((bytesReceived / 1024) / 1024), 2)
-        total_data_MB = round(((bytesTotal / 1024) / 1024), 2)
-        downloaded_KB, total_data_KB = bytesReceived / 1024, bytesTotal / 1024
-        # Calculate download speed values, with precision from Kb/s to Gb/s
-        elapsed = time.clock()
-        if elapsed > 0:
-            speed = round((downloaded_KB / elapsed), 2)
-            if speed > 1024000:  # Gigabyte speeds
-                download_speed = "{} GigaByte/Second".format(speed // 1024000)
-            if speed > 1024:  # MegaByte speeds
-                download_speed = "{} MegaBytes/Second".format(speed // 1024)
-            else:  # KiloByte speeds
-                download_speed = "{} KiloBytes/Second".format(int(speed))
-        if speed > 0:
-            missing = abs((total_data_KB - downloaded_KB) // speed)
-        percentage = int(100.0 * bytesReceived // bytesTotal)
+        elapsed = max(time.time() - self._time, 0.001)
+        speed = bytesReceived / elapsed  # Bytes per Second of this session
+        bytesReceived += self._offset
+        bytesTotal = bytesTotal + self._offset if bytesTotal > 0 else 0
+        missing = (bytesTotal - bytesReceived) / speed if speed else 0
+        percentage = int(100.0 * bytesReceived // bytesTotal) if (
+            bytesTotal) else 0
+        speeds = self._segments.speeds() if self._segments else None
         self.setLabelText(self.template.format(
             self._url.lower()[:99], self._dst.lower()[:99],
             self._date, datetime.now().isoformat()[:-7],
-            self.seconds_time_to_human_string(time.time() - self._time),
+            self.seconds_time_to_human_string(elapsed),
             self.seconds_time_to_human_string(missing),
-            downloaded_MB, total_data_MB, download_speed, percentage))
+            round(bytesReceived / 1024 / 1024, 2),
+            round(bytesTotal / 1024 / 1024, 2), format_speed(speed),
+            percentage, "{}: {}".format(len(speeds), ", ".join(
+                format_speed(speed) for speed in speeds)) if speeds else 1))
         self.setValue(percentage)
 
 
 ###############################################################################
 
 
-def get_blender_version():
-    """
-    Try to return Blender version if fails return the default docstring.
+class LaunchServer(QLocalServer):
 
-    >>> isinstance(get_blender_version(), str)
-    True
+    """Local socket server of the resident launcher,it launches Games.
+
+    Requests and replies are JSON lines,a launch replies the PID of the
+    player and then its exit code. Caches stay warm between launches:
+    the opened Games (decrypted,extracted or In-RAM) and the Game Library.
     """
-    try:
-        ver = check_output("blender --version", shell=True).splitlines()[0]
-        ver = str(ver[:-7]).strip().lower()
-    except:
-        ver = __doc__.strip().lower()
-    finally:
-        log.info(ver)
-        return ver
+
+    def __init__(self, parent=None, cache=None, socket_file=RESIDENT_SOCKET):
+        """Init class."""
+        super(LaunchServer, self).__init__(parent)
+        self.socket_file, self.cache = socket_file, cache or ExtractionCache()
+        self.games, self.library, self.launches = {}, None, {}
+        self.available_cpus = os.sched_getaffinity(0) if hasattr(
+            os, "sched_getaffinity") else None
+        self.setSocketOptions(QLocalServer.UserAccessOption)
+        self.newConnection.connect(self._connected)
+
+    def start(self):
+        """Listen on the socket,return False if other launcher listens."""
+        if ping_resident(self.socket_file):
+            return False
+        QLocalServer.removeServer(self.socket_file)  # Stale,of a crash
+        os.makedirs(os.path.dirname(self.socket_file), exist_ok=True)
+        return self.listen(self.socket_file)
+
+    def _connected(self):
+        """Read the requests of new connections."""
+        while self.hasPendingConnections():
+            connection = self.nextPendingConnection()
+            connection.readyRead.connect(partial(self._read, connection))
+
+    def _read(self, connection):
+        """Handle a request once its whole line arrived."""
+        if not connection.canReadLine():
+            return
+        try:
+            self.handle(json.loads(bytes(connection.readLine()).decode(
+                "utf-8")), connection)
+        except Exception as reason:
+            log.warning(reason)
+            self._reply(connection, {"error": str(reason)}, close=True)
+
+    def _reply(self, connection, reply, close=False):
+        """Send a reply,if the client is still connected."""
+        if connection is None:
+            return
+        if connection.state() == QLocalSocket.ConnectedState:
+            connection.write(json.dumps(reply).encode("utf-8") + b"\n")
+            connection.flush()
+        if close:
+            connection.disconnectFromServer()
+            connection.deleteLater()
+
+    def find_game(self, game):
+        """Return the file of a Game,a file or a title on the Game Library."""
+        if not game or os.path.isfile(game):
+            return game
+        self.library = self.library or GameLibrary()
+        for entry in self.library.games():
+            if game in (entry["title"], os.path.basename(entry["path"])):
+                return entry["path"]
+        return game
+
+    def open_game(self, game_file, in_ram=False, password=""):
+        """Open a Game once,keep it opened for the next launches."""
+        key = (os.path.abspath(game_file), os.stat(game_file).st_mtime_ns,
+               in_ram)
+        if key not in self.games:
+            for old in [old for old in self.games if old[0] == key[0]]:
+                memory_file = self.games.pop(old)[1]  # Changed since opened
+                if memory_file:
+                    memory_file.close()
+            if game_file.lower().endswith((".zip", CONTAINER_EXT)):
+                self.games[key] = open_game(game_file, password or (
+                    codecs.decode(PASSWORD, "rot13")), in_ram, self.cache)
+            else:
+                self.games[key] = (open_compressed_blend(
+                    game_file, self.cache), None)
+        return self.games[key][0]
+
+    def handle(self, request, connection):
+        """Handle a request,ping,quit or launch a Game."""
+        if request.get("ping"):
+            return self._reply(connection, {"pong": os.getpid()}, close=True)
+        if request.get("quit"):
+            self._reply(connection, {"quit": os.getpid()}, close=True)
+            return QApplication.instance().quit()
+        started = time.perf_counter()
+        options = LaunchOptions.from_file(request["profile"]) if (
+            request.get("profile")) else LaunchOptions()
+        game_file = self.find_game(request.get("game") or options.game)
+        options = apply_tuned_settings(options, game_file)
+        argv = options.argv(self.open_game(game_file, options.in_ram,
+                                           request.get("password", "")))
+        process = QProcess(self)
+        process.setProcessChannelMode(QProcess.ForwardedChannels)
+        self.launches[process] = {"connection": connection, "options": (
+            options), "detach": request.get("detach"), "started": started}
+        process.started.connect(partial(self._started, process))
+        process.finished.connect(partial(self._finished, process))
+        process.error.connect(partial(self._failed, process))
+        log.debug(argv)
+        process.start(argv[0], argv[1:])
+
+    def _started(self, process):
+        """Apply the priority profile,reply the PID."""
+        launch, pid = self.launches[process], int(process.processId())
+        try:
+            apply_priority(pid, priority_settings(launch["options"],
+                                                  self.available_cpus))
+        except (OSError, TypeError) as reason:
+            log.warning(reason)
+        log.info("Resident launch of PID {} took {:.3f} Seconds.".format(
+            pid, time.perf_counter() - launch["started"]))
+        self._reply(launch["connection"], {"pid": pid},
+                    close=launch["detach"])
+        if launch["detach"]:
+            launch["connection"] = None
+
+    def _finished(self, process, exit_code, exit_status):
+        """Reply the exit code of the player."""
+        launch = self.launches.pop(process)
+        self._reply(launch["connection"], {
+            "exit": exit_code,
+            "crashed": exit_status == QProcess.CrashExit}, close=True)
+        process.deleteLater()
+
+    def _failed(self, process, error):
+        """Reply the error of a player that could not start."""
+        if process.state() == QProcess.NotRunning and (
+                process in self.launches):
+            launch = self.launches.pop(process)
+            self._reply(launch["connection"], {
+                "error": process.errorString()}, close=True)
+            process.deleteLater()
 
 
 class MainWindow(QMainWindow):
@@ -178,7 +4692,10 @@ class MainWindow(QMainWindow):
         """Init class."""
         super(MainWindow, self).__init__()
         QNetworkProxyFactory.setUseSystemConfiguration(True)
-        self.statusBar().showMessage(get_blender_version())
+        self.version_probe = None
+        with TRACER.span("blender version"):
+            self.statusBar().showMessage(
+                load_cached_blender_version() or self.probe_blender_version())
         self.setWindowTitle(__doc__.strip().capitalize())
         self.setMinimumSize(400, 200)
         self.setMaximumSize(1024, 800)
@@ -186,7 +4703,17 @@ class MainWindow(QMainWindow):
         self.setWindowIcon(QIcon.fromTheme("blender"))
         self.center()
         QShortcut("Ctrl+q", self, activated=lambda: self.close())
-        self.menuBar().addMenu("&File").addAction("Exit", exit)
+        fileMenu = self.menuBar().addMenu("&File")
+        fileMenu.addAction("Game Library...", self.choose_game, "Ctrl+l")
+        fileMenu.addAction("Add Game Folder...", self.add_game_folder)
+        fileMenu.addSeparator()
+        fileMenu.addAction("Load Launch Profile...", self.load_profile)
+        fileMenu.addAction("Save Launch Profile...", self.save_profile)
+        fileMenu.addAction("Relaunch last Game", self.relaunch, "Ctrl+r")
+        fileMenu.addAction("View Game Output...", self.show_game_output)
+        fileMenu.addAction("Run Instances...", self.run_instances)
+        fileMenu.addSeparator()
+        fileMenu.addAction("Exit", exit)
         windowMenu = self.menuBar().addMenu("&Window")
         windowMenu.addAction("Minimize", lambda: self.showMinimized())
         windowMenu.addAction("Maximize", lambda: self.showMaximized())
@@ -233,18 +4760,37 @@ class MainWindow(QMainWindow):
         helpMenu.addAction("View GitHub Repo", lambda: open_new_tab(__url__))
         helpMenu.addAction("Report Bugs", lambda: open_new_tab(
             'https://github.com/juancarlospaco/bgelauncher/issues?state=open'))
-        helpMenu.addAction("Check Updates", lambda: Downloader(self))
+        helpMenu.addAction("Check Updates", self.check_updates)
         # process
         self.process = QProcess()
         self.process.readyReadStandardOutput.connect(self._read_output)
         self.process.readyReadStandardError.connect(self._read_errors)
         self.process.finished.connect(self._process_finished)
         self.process.error.connect(self._process_failed)
+        self.process.started.connect(self._process_started)
+        self.monitor, self.monitor_timer = None, QTimer(self)
+        self.monitor_timer.timeout.connect(self._sample_resources)
+        self.cache, self.memory_file = ExtractionCache(), None
+        self.network = QNetworkAccessManager(self)
+        self.last_argv, self.capture = None, OutputCapture()
+        self.launched, self.game_file, self.library = None, GAME_FILE, None
+        self.supervisor, self.supervisor_timer = None, QTimer(self)
+        self.supervisor_timer.timeout.connect(self._poll_instances)
+        self.throttle, self.desktop = None, None
+        self.server, self.tray = None, None
+        self.throttle_timer, self.wallpaper_timer = QTimer(self), QTimer(self)
+        self.throttle_timer.timeout.connect(lambda: self.throttle.tick())
+        self.wallpaper_timer.timeout.connect(self._watch_wallpaper)
+        self.last_cursor, self.last_input = None, time.monotonic()
+        self.last_options = LaunchOptions()
+        self.available_cpus = os.sched_getaffinity(0) if hasattr(
+            os, "sched_getaffinity") else None
 
         # widgets
         self.group0, self.group1 = QGroupBox("BGE"), QGroupBox("Resolutions")
         self.group2, self.group3 = QGroupBox("AntiAlias"), QGroupBox("3DViews")
         self.group4, self.group5 = QGroupBox("Dome mode"), QGroupBox("Misc")
+        self.group6 = QGroupBox("Telemetry")
         g0grid, g1vlay = QGridLayout(self.group0), QVBoxLayout(self.group1)
         g5vlay, g4vlay = QVBoxLayout(self.group5), QVBoxLayout(self.group4)
         g2vlay, g3vlay = QVBoxLayout(self.group2), QVBoxLayout(self.group3)
@@ -304,9 +4850,7 @@ class MainWindow(QMainWindow):
 
         # group 3 the 3d stereo view mode
         self.stereos, self.smode = QCheckBox("3D View"), QComboBox()
-        self.smode.addItems([
-            "NoStereo", "Anaglyph", "SideBySide", "SyncDoubling",
-            "3DTVTopBottom", "Interlace", "VInterlace", "HWPageFlip"])
+        self.smode.addItems(STEREO_MODES)
         g3vlay.addWidget(self.stereos)
         g3vlay.addWidget(QLabel("Stereoscopy"))
         g3vlay.addWidget(self.smode)
@@ -314,8 +4858,7 @@ class MainWindow(QMainWindow):
 
         # group 4 the dome view mode
         self.dome, self.dmode = QCheckBox("Dome View"), QComboBox()
-        self.dmode.addItems(["Fisheye", "TruncatedFront", "TruncatedRear",
-                             "CubeMap", "SphericalPanoramic"])
+        self.dmode.addItems(DOME_MODES)
         self.dangle, self.dtilt = QSpinBox(), QSpinBox()
         self.dangle.setToolTip("Field of view in degrees")
         self.dtilt.setToolTip("Tilt angle in degrees")
@@ -334,11 +4877,24 @@ class MainWindow(QMainWindow):
         self.chrt, self.ionice = QCheckBox("Slow CPU"), QCheckBox("Slow HDD")
         self.minimi = QCheckBox("Auto Minimize")
         self.embeds = QCheckBox("Wallpaper mode")
+        self.inram = QCheckBox("In-RAM game")
+        self.telemetry = QCheckBox("Telemetry")
+        self.prefetch = QCheckBox("Prefetch game")
+        self.priority, self.cpus = QComboBox(), QComboBox()
+        self.priority.addItems(sorted(PRIORITY_PROFILES))
+        self.priority.setCurrentText("Normal")
+        self.cpus.setEditable(True)
+        self.cpus.addItems(["", format_cpu_list(self.available_cpus or [])])
         self.chrt.setToolTip("Use Low CPU speed priority (Linux only)")
         self.ionice.setToolTip("Use Low HDD speed priority (Linux only)")
         self.debug.setToolTip("Use BGE Verbose logs,ideal for Troubleshooting")
         self.minimi.setToolTip("Automatically Minimize Launcher after launch")
         self.embeds.setToolTip("Embed Game as interactive Desktop Wallpaper")
+        self.inram.setToolTip("Decrypt ZIP Games to RAM,never write to disk")
+        self.telemetry.setToolTip("Collect FPS,Frame times and Profile live")
+        self.prefetch.setToolTip("Read Game and its libraries before launch")
+        self.priority.setToolTip("Game priority: Nice,IO priority and CPUs")
+        self.cpus.setToolTip("Game CPUs like 2-5,launcher runs on the rest")
         self.minimi.setChecked(True)
         if not sys.platform.startswith('linux'):
             self.chrt.setDisabled(True)
@@ -348,8 +4904,21 @@ class MainWindow(QMainWindow):
         g5vlay.addWidget(self.chrt)
         g5vlay.addWidget(self.ionice)
         g5vlay.addWidget(self.embeds)
+        g5vlay.addWidget(self.inram)
+        g5vlay.addWidget(self.telemetry)
+        g5vlay.addWidget(self.prefetch)
+        g5vlay.addWidget(QLabel("Priority"))
+        g5vlay.addWidget(self.priority)
+        g5vlay.addWidget(QLabel("CPUs"))
+        g5vlay.addWidget(self.cpus)
         g5vlay.addWidget(self.minimi)
 
+        # group 6 live telemetry of the running game
+        self.telemetry_label = QLabel("<small><i>Not running.")
+        self.telemetry_timer = QTimer(self)
+        self.telemetry_timer.timeout.connect(self._update_telemetry)
+        QVBoxLayout(self.group6).addWidget(self.telemetry_label)
+
         # option to show or hide some widgets on the gui
         self.guimode = QComboBox()
         self.guimode.addItems(('Full UX / UI', 'Simple UX / UI'))
@@ -360,6 +4929,29 @@ class MainWindow(QMainWindow):
             margin-left:25px;color:gray;text-decoration:underline}""")
         self.guimode.currentIndexChanged.connect(self._set_guimode)
 
+        # launch profile options, the keys of the JSON launch profiles
+        self.profile_widgets = {
+            "debug": self.debug, "antialias": self.aaa, "samples": self.aas,
+            "dome": self.dome, "dome_mode": self.dmode,
+            "dome_angle": self.dangle, "dome_tilt": self.dtilt,
+            "stereo": self.stereos, "stereo_mode": self.smode,
+            "no_audio": self.nosound, "fixed_time": self.fixedti,
+            "no_mipmaps": self.mipmaps, "show_framerate": self.showfps,
+            "show_properties": self.propert, "show_profile": self.profile,
+            "blender_material": self.materia,
+            "show_deprecations": self.depreca, "fullscreen": self.fullscreen,
+            "autodetect": self.autodetect, "width": self.width,
+            "height": self.heigt, "bpp": self.bpp, "wallpaper": self.embeds,
+            "slow_hdd": self.ionice, "slow_cpu": self.chrt,
+            "in_ram": self.inram, "telemetry": self.telemetry,
+            "prefetch": self.prefetch, "priority": self.priority,
+            "cpus": self.cpus}
+        tuned = apply_tuned_settings(self.get_launch_options(), GAME_FILE)
+        self.set_launch_options(tuned)
+        self.prefetched = set()
+        if self.prefetch.isChecked() and GAME_FILE.lower().endswith(".blend"):
+            self.start_prefetch(GAME_FILE)  # While the user picks settings
+
         # buttons from bottom to close or proceed
         self.bt = QDialogButtonBox(self)
         self.bt.setStandardButtons(QDialogButtonBox.Ok |
@@ -377,103 +4969,474 @@ class MainWindow(QMainWindow):
         container_layout.addWidget(self.group1, 2, 1)
         container_layout.addWidget(self.group4, 1, 2)
         container_layout.addWidget(self.group5, 2, 2)
+        container_layout.addWidget(self.group6, 3, 0)
         container_layout.addWidget(self.bt, 3, 1)
         self.setCentralWidget(container)
 
+    def probe_blender_version(self):
+        """Run blender --version asynchronously,show version when done."""
+        self.version_probe = QProcess(self)
+        self.version_probe.finished.connect(self._version_probe_finished)
+        self.version_probe.error.connect(self._version_probe_failed)
+        self.version_probe.start("blender", ["--version"])
+        return "Probing Blender version..."
+
+    def _version_probe_failed(self):
+        """Show the default docstring if Blender can not be found."""
+        self.statusBar().showMessage(__doc__.strip().lower())
+
+    def _version_probe_finished(self):
+        """Parse,cache and show the version of Blender."""
+        try:
+            ver = parse_blender_version(
+                bytes(self.version_probe.readAllStandardOutput()))
+            save_cached_blender_version(ver)
+        except Exception as reason:
+            log.warning(reason)
+            ver = __doc__.strip().lower()
+        log.info(ver)
+        self.statusBar().showMessage(ver)
+
+    def get_launch_options(self):
+        """Return validated LaunchOptions with the values of the widgets."""
+        options = {}
+        for key, widget in self.profile_widgets.items():
+            if isinstance(widget, QCheckBox):
+                options[key] = widget.isChecked()
+            elif isinstance(widget, QSpinBox):
+                options[key] = int(widget.value())
+            else:
+                options[key] = str(widget.currentText()).strip()
+        return LaunchOptions(**options)
+
+    def set_launch_options(self, options):
+        """Set the widgets from the values of LaunchOptions."""
+        for key, widget in self.profile_widgets.items():
+            value = getattr(options, key)
+            if isinstance(widget, QCheckBox):
+                widget.setChecked(value)
+            elif isinstance(widget, QSpinBox):
+                widget.setValue(value)
+            else:
+                if widget.findText(str(value)) == -1:
+                    widget.addItem(str(value))
+                widget.setCurrentText(str(value))
+
+    def add_game_folder(self):
+        """Ask for a folder and add its Games to the Game Library."""
+        directory = str(QFileDialog.getExistingDirectory(
+            self, __doc__ + "- Add Game Folder",
+            os.path.expanduser("~"))).strip()
+        if directory:
+            self.library = self.library or GameLibrary()
+            self.library.add_directory(directory)
+            self.statusBar().showMessage(str(self.library))
+            self.choose_game()
+
+    def choose_game(self):
+        """Rescan the Game Library and choose the Game to launch from it."""
+        self.library = self.library or GameLibrary()
+        if not self.library.directories():
+            return self.add_game_folder()
+        self.library.scan()
+        self.statusBar().showMessage(str(self.library))
+        games = [game for game in self.library.games() if not game["error"]]
+        if not games:
+            return QMessageBox.information(self, __doc__.title(),
+                                           "<b>No Games on the Game Library.")
+        items = ["{} ({}{}) {}".format(
+            game["title"], "Encrypted" if game["encrypted"] else
+            "Blender " + str(game["version"]), ", Compressed" if (
+                game["compressed"]) else "", ", ".join(game["scenes"] or []))
+            for game in games]
+        item, ok = QInputDialog.getItem(self, __doc__ + "- Game Library",
+                                        "Game", items, 0, False)
+        if ok and items:
+            self.game_file = games[items.index(str(item))]["path"]
+            self.setWindowTitle("{} - {}".format(
+                __doc__.strip().capitalize(), os.path.basename(
+                    self.game_file)))
+            self.set_launch_options(apply_tuned_settings(
+                self.get_launch_options(), self.game_file))
+            if self.prefetch.isChecked():
+                self.start_prefetch(self.game_file)
+
+    def save_profile(self):
+        """Ask for a filename and save the launch profile, for --launch."""
+        filename = str(QFileDialog.getSaveFileName(
+            self, __doc__ + "- Save Launch Profile", os.path.expanduser("~"),
+            "Launch Profile JSON (*.json)")[0]).strip()
+        if filename:
+            try:
+                self.get_launch_options().to_file(filename)
+            except ValueError as reason:
+                QMessageBox.warning(self, __doc__.title(), str(reason))
+
+    def load_profile(self):
+        """Ask for a filename and load the launch profile into the widgets."""
+        filename = str(QFileDialog.getOpenFileName(
+            self, __doc__ + "- Load Launch Profile", os.path.expanduser("~"),
+            "Launch Profile JSON (*.json)")[0]).strip()
+        if filename and os.path.isfile(filename):
+            try:
+                self.set_launch_options(LaunchOptions.from_file(filename))
+            except ValueError as reason:
+                QMessageBox.warning(self, __doc__.title(), str(reason))
+
     def run(self):
         """Run the main method and run BlenderPlayer."""
-        condition = self.autodetect.isChecked() and self.fullscreen.isChecked()
-        dome_mode = str(self.dmode.currentText()).lower().strip()
-        ster_mode = str(self.smode.currentText()).lower().strip()
-        dome_angl, dome_tilt = int(self.dangle.value()), self.dtilt.value()
-        show_deprecated = self.depreca.isChecked()
-        desktop_win_ids = int(QApplication.desktop().winId())
-        command_to_run_blenderplayer = " ".join((
-            "ionice --ignore --class 3" if self.ionice.isChecked() else "",
-            "chrt --verbose --idle 0" if self.chrt.isChecked() else "",
-            "blenderplayer",
-            "-d" if self.debug.isChecked() else "",
-            "-m {}".format(self.aas.value()) if self.aaa.isChecked() else "",
-            "-D mode {}".format(dome_mode) if self.dome.isChecked() else "",
-            "-D angle {}".format(dome_angl) if self.dome.isChecked() else "",
-            "-D tilt {}".format(dome_tilt) if self.dome.isChecked() else "",
-            "-s {}".format(ster_mode) if self.stereos.isChecked() else "",
-            "-g noaudio" if self.nosound.isChecked() else "",
-            "-g fixedtime=1" if self.fixedti.isChecked() else "",
-            "-g nomipmap=1" if self.mipmaps.isChecked() else "",
-            "-g show_framerate=1" if self.showfps.isChecked() else "",
-            "-g show_properties=1" if self.propert.isChecked() else "",
-            "-g show_profile=1" if self.profile.isChecked() else "",
-            "-g blender_material=1" if self.materia.isChecked() else "",
-            "-g ignore_deprecation_warnings=0" if show_deprecated else "",
-            "-f" if self.fullscreen.isChecked() else "-w",
-            "0" if condition else str(self.width.currentText()),
-            "0" if condition else str(self.heigt.currentText()),
-            str(self.bpp.currentText()) if self.fullscreen.isChecked() else "",
-            "-i {}".format(desktop_win_ids) if self.embeds.isChecked() else "",
-            self.open_game_file(GAME_FILE))).strip()
-        log.debug(command_to_run_blenderplayer)
+        started = time.perf_counter()
+        try:
+            options = self.get_launch_options()
+        except ValueError as reason:
+            return self.statusBar().showMessage(str(reason))
+        with TRACER.span("open game file"):
+            game_file = self.open_game_file(self.game_file)
+        if not game_file:
+            return self.statusBar().showMessage(" ERROR: No Game file ! ")
+        if options.prefetch:
+            self.start_prefetch(game_file)
+        self.last_options = options
+        self.last_argv = options.argv(
+            game_file, int(QApplication.desktop().winId()))
+        log.info("Game ready to launch after {:.3f} Seconds.".format(
+            time.perf_counter() - started))
+        log.info("Launcher overhead {:.3f} Seconds since process start."
+                 .format(get_process_uptime()))
+        self.relaunch()
+
+    def relaunch(self):
+        """Start BlenderPlayer again with the last argv,no widgets read."""
+        if self.last_argv and self.last_argv[-1] is None:  # In-RAM released
+            game_file = self.open_game_file(self.game_file)
+            if not game_file:
+                return self.statusBar().showMessage(" ERROR: No Game file ! ")
+            self.last_argv[-1] = game_file
+        if not self.last_argv or not os.path.exists(self.last_argv[-1]):
+            return self.run()
+        log.debug(self.last_argv)
         if self.minimi.isChecked():
             self.showMinimized()
-        self.process.start(command_to_run_blenderplayer)
+        self.capture.close()
+        self.capture = OutputCapture(
+            os.path.splitext(self.game_file)[0] + ".log" if (
+                self.log.isChecked())
+            else None, telemetry=TelemetrySeries()
+            if self.telemetry.isChecked() else None)
+        environment = QProcessEnvironment()
+        for key, value in (telemetry_environment() if (
+                self.telemetry.isChecked()) else os.environ).items():
+            environment.insert(key, value)
+        self.process.setProcessEnvironment(environment)
+        if self.telemetry.isChecked():
+            self.telemetry_timer.start(500)
+        self.launched = time.perf_counter()
+        self.process.start(self.last_argv[0], self.last_argv[1:])
+
+    def start_prefetch(self, game_file):
+        """Prefetch a .blend and its libraries on a background thread."""
+        try:
+            key = (os.path.abspath(game_file), os.stat(game_file).st_mtime_ns)
+        except OSError:
+            return
+        if key not in self.prefetched:
+            self.prefetched.add(key)
+            threading.Thread(target=prefetch_game, args=(game_file, ),
+                             name="Prefetch", daemon=True).start()
+
+    def _log_first_output(self, text):
+        """Log the time from launch to the first output of the Game."""
+        if text and self.launched is not None:
+            log.info("First Game output after {:.3f} Seconds,prefetch {}."
+                     .format(self.capture.first_output - self.launched,
+                             "on" if self.prefetch.isChecked() else "off"))
+            TRACER.add("launch to first output", self.launched,
+                       self.capture.first_output)
+            self.launched = None
+        return text
 
     def open_game_file(self, game_file):
         """Open a Game file."""
         if not os.path.isfile(game_file):
             game_file = str(QFileDialog.getOpenFileName(
                 self, __doc__ + "- Open Blender Game", os.path.expanduser("~"),
-                "Blender Game Engine file (*.blend)")[0]).strip()
+                "Blender Game Engine file (*.blend *.zip *{})".format(
+                    CONTAINER_EXT))[0]).strip()
             if game_file and os.path.isfile(game_file):
-                return game_file
+                return self.open_game_file(game_file)
             else:
                 return
-        elif game_file.lower().endswith(".blend"):
+        elif game_file.lower().endswith(".blend") and not (
+                is_compressed_blend(game_file)):
             return game_file
-        elif game_file.lower().endswith(".zip"):
-            if not len(PASSWORD):
+        elif game_file.lower().endswith((".blend", ".zip", CONTAINER_EXT)):
+            if game_file.lower().endswith(".blend"):
+                pwd = ""  # A gzip .blend,decompressed once on the cache
+            elif not len(PASSWORD):
                 pwd = QInputDialog.getText(self, __doc__, "Game SerialKey")[0]
             else:
                 pwd = codecs.decode(PASSWORD, "rot13")
+            dialog = QProgressDialog("Opening " + game_file, None, 0, 100,
+                                     self)
+            dialog.setWindowTitle(__doc__.strip().capitalize())
+            dialog.setMinimumDuration(500)
+
+            def update_progress(done, total):
+                dialog.setValue(int(100.0 * done // total))
+                QApplication.processEvents()
+
             try:
-                with ZipFile(game_file, "r") as zipy:
-                    zipy.setpassword(str(pwd))
-                    # zipy.setpassword(PASSWORD)
-                    if zipy.testzip():
-                        zipy.extractall()
-                        zipy.close()
-                        return game_file.replace(".zip", ".blend")
+                self.release_memory_file()
+                with TRACER.span("extract game", {"game": game_file}):
+                    if game_file.lower().endswith(".blend"):
+                        blend = open_compressed_blend(game_file, self.cache,
+                                                      update_progress)
+                    else:
+                        blend, self.memory_file = open_game(
+                            game_file, pwd, self.inram.isChecked(),
+                            self.cache, update_progress)
+                self.statusBar().showMessage(str(self.cache))
+                return blend
             except Exception as e:
                 log.warning(e)
+                self.statusBar().showMessage(" ERROR: Invalid Game file ! ")
+            finally:
+                dialog.close()
+
+    def release_memory_file(self):
+        """Release the RAM used by an In-RAM Game file, if any."""
+        if self.memory_file:
+            if self.last_argv and self.last_argv[-1] == self.memory_file.path:
+                self.last_argv[-1] = None  # The fd number may get reused
+            self.memory_file.close()
+            self.memory_file = None
+
+    def _process_started(self):
+        """Apply the priority profile,start sampling the Game resources."""
+        TRACER.add("process start", self.launched)
+        try:
+            settings = priority_settings(self.last_options,
+                                         self.available_cpus)
+            self.statusBar().showMessage(format_scheduling(apply_priority(
+                int(self.process.processId()), settings)))
+            if settings["launcher_cpus"]:
+                set_launcher_cpus(settings["launcher_cpus"])
+        except (OSError, TypeError, AttributeError) as reason:
+            log.warning(reason)  # Not Linux,or the Game already exited
+        self.monitor = ResourceMonitor(int(self.process.processId()))
+        self.monitor_timer.start(int(MONITOR_INTERVAL * 1000))
+        self._sample_resources()
+        if self.last_options.wallpaper:
+            self.throttle = WallpaperThrottle(int(self.process.processId()))
+            self.desktop = self.desktop or X11Desktop()
+            self.last_input = time.monotonic()
+            self.throttle_timer.start(25)
+            self.wallpaper_timer.start(250)
+
+    def _watch_wallpaper(self):
+        """Throttle the wallpaper Game when nobody sees it,resume on input."""
+        now, cursor = time.monotonic(), QCursor.pos()
+        if cursor != self.last_cursor:
+            self.last_cursor, self.last_input = cursor, now
+        idle, visible, x11_idle = now - self.last_input, True, (
+            self.desktop.idle())
+        if x11_idle:  # Keyboard too,and the screensaver hides the Desktop
+            idle, visible = min(idle, x11_idle[0]), not x11_idle[1]
+        visible = visible and not self.desktop.covered()
+        self.throttle.update(idle, visible, bool(on_battery()))
+        self.statusBar().showMessage(str(self.throttle))
+
+    def stop_throttle(self):
+        """Resume the wallpaper Game for good and log its CPU usage."""
+        self.throttle_timer.stop()
+        self.wallpaper_timer.stop()
+        if self.throttle:
+            log.info("Wallpaper Game CPU usage: {}".format(
+                self.throttle.resume()))
+        self.throttle = None
+
+    def _sample_resources(self):
+        """Take a sample of the resources used by the Game."""
+        if self.monitor:
+            self.monitor.sample()
+
+    def export_resources(self):
+        """Stop sampling and write the run summary next to the Game log."""
+        self.monitor_timer.stop()
+        if self.monitor and len(self.monitor.series):
+            try:
+                log.info("Resources used by the Game written to {}.".format(
+                    self.monitor.to_json(os.path.splitext(
+                        self.game_file)[0] + ".resources.json")))
+            except OSError as reason:
+                log.warning(reason)
+        self.monitor = None
 
     def _process_finished(self):
         """Finished sucessfully."""
         self.showNormal()
-        if self.log.isChecked():
-            try:
-                with open(GAME_FILE.replace(".blend", ".log"), "w") as _log:
-                    _log.write(self._read_output())
-                    _log.write(self._read_errors())
-            except Exception as e:
-                log.warning(e)
+        self.stop_throttle()
+        if self.available_cpus:
+            set_launcher_cpus(self.available_cpus)
+        self.release_memory_file()
+        self._read_output()
+        self._read_errors()
+        self.capture.close()
+        self.export_telemetry()
+        self.export_resources()
 
     def _read_output(self):
-        """Read and return output."""
-        return str(self.process.readAllStandardOutput()).strip()
+        """Read and capture output,return the decoded text."""
+        return self._log_first_output(self.capture.feed(
+            "stdout", bytes(self.process.readAllStandardOutput())))
 
     def _read_errors(self):
-        """Read and return errors."""
-        return str(self.process.readAllStandardError()).strip()
+        """Read and capture errors,return the decoded text."""
+        return self._log_first_output(self.capture.feed(
+            "stderr", bytes(self.process.readAllStandardError())))
 
     def _process_failed(self):
         """Read and return errors."""
         self.showNormal()
+        self.stop_throttle()
+        self.release_memory_file()
         self.statusBar().showMessage(" ERROR: BlenderPlayer Failed ! ")
-        return str(self.process.readAllStandardError()).strip().lower()
+        errors = self._read_errors()
+        if self.process.state() == QProcess.NotRunning:
+            self.capture.close()
+        return errors.strip().lower()
+
+    def _update_telemetry(self):
+        """Show the last telemetry sample on the Telemetry panel."""
+        if not self.capture.telemetry or not len(self.capture.telemetry):
+            return
+        self.telemetry_label.setText("<small>" + "<br>".join(
+            "<b>{}:</b> {:.2f}".format(name.replace("_", " ").title(), value)
+            for name, value in sorted(self.capture.telemetry.last().items())))
+
+    def export_telemetry(self):
+        """Export the telemetry of the Game as CSV and JSON,next to its log."""
+        self.telemetry_timer.stop()
+        self._update_telemetry()
+        if not self.capture.telemetry or not len(self.capture.telemetry):
+            return
+        telemetry = self.capture.telemetry
+        name = os.path.splitext(self.game_file)[0] + ".telemetry"
+        try:
+            log.info("Telemetry exported to {} and {}.".format(
+                telemetry.to_csv(name + ".csv"),
+                telemetry.to_json(name + ".json")))
+        except OSError as reason:
+            log.warning(reason)
+
+    def show_game_output(self):
+        """Show the last lines of output of the Game."""
+        dialog = QMessageBox(QMessageBox.Information, __doc__.title(),
+                             "<b>Last lines of output of the Game",
+                             parent=self)
+        dialog.setDetailedText("\n".join(self.capture.tail()))
+        dialog.exec_()
+
+    def run_instances(self):
+        """Ask for an instances JSON and run the Game once per instance."""
+        filename = str(QFileDialog.getOpenFileName(
+            self, __doc__ + "- Run Instances", os.path.expanduser("~"),
+            "Instances JSON (*.json)")[0]).strip()
+        if not filename or not os.path.isfile(filename):
+            return
+        try:
+            instances = load_instances(self.get_launch_options(), filename)
+        except (ValueError, TypeError) as reason:
+            return QMessageBox.warning(self, __doc__.title(), str(reason))
+        self.stop_instances()
+        game_file = self.open_game_file(self.game_file)
+        if not game_file:
+            return self.statusBar().showMessage(" ERROR: No Game file ! ")
+        self.supervisor = Supervisor(instances, game_file)
+        self.supervisor_dialog = QMessageBox(
+            QMessageBox.Information, __doc__.title(), "<b>Instances",
+            QMessageBox.Close, self)
+        self.supervisor_dialog.setModal(False)
+        self.supervisor_dialog.finished.connect(self.stop_instances)
+        self.supervisor_dialog.show()
+        self.supervisor_timer.start(250)
+        self._poll_instances()
+
+    def _poll_instances(self):
+        """Poll the Supervisor without blocking,show status of instances."""
+        if not self.supervisor:
+            return self.supervisor_timer.stop()
+        if not self.supervisor.poll():
+            self.supervisor_timer.stop()
+        self.statusBar().showMessage(str(self.supervisor))
+        self.supervisor_dialog.setText("<b>{}</b><br>{}".format(
+            self.supervisor, "<br>".join(
+                "#{index} {status} PID {pid} Crashes {crashes} "
+                "Uptime {uptime:.0f}s {output}".format(**dict(
+                    status, output=html.escape(status["output"][:80])))
+                for status in self.supervisor.statuses())))
+
+    def stop_instances(self):
+        """Stop all the instances of the Supervisor,if any."""
+        self.supervisor_timer.stop()
+        if self.supervisor:
+            self.supervisor.stop()
+            log.info(self.supervisor)
+        self.supervisor = None
+
+    def start_resident(self):
+        """Stay resident on the tray,launch Games requested on the socket."""
+        self.server = LaunchServer(self, self.cache)
+        if not self.server.start():
+            log.error("Other resident launcher is listening on {}.".format(
+                RESIDENT_SOCKET))
+            return False
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            menu = QMenu(self)
+            menu.addAction("Show", self.showNormal)
+            menu.addAction("Quit", QApplication.instance().quit)
+            self.tray = QSystemTrayIcon(QIcon.fromTheme("blender"), self)
+            self.tray.setContextMenu(menu)
+            self.tray.setToolTip(__doc__.strip().capitalize() + " resident")
+            self.tray.show()
+        else:
+            self.showMinimized()
+        log.info("Resident launcher listening on {}.".format(
+            RESIDENT_SOCKET))
+        return True
+
+    def check_updates(self):
+        """Fetch the published SHA256 of the latest version,not blocking."""
+        self.statusBar().showMessage("Checking for updates...")
+        reply = self.network.get(QNetworkRequest(QUrl(
+            __source__ + ".sha256")))
+        reply.finished.connect(partial(self._download_update, reply))
+
+    def _download_update(self, reply):
+        """Download the latest version,verified with its SHA256 if any."""
+        reply.deleteLater()
+        checksum = None
+        status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+        try:
+            if status in (404, 410):  # Not published,size and syntax only
+                log.warning("No SHA256 published for {}.".format(__source__))
+            elif reply.error():
+                raise ValueError(reply.errorString())
+            else:
+                checksum = parse_checksum(bytes(reply.readAll()),
+                                          reply.url().toString())
+        except ValueError as reason:
+            log.error(reason)
+            return QMessageBox.warning(
+                self, __doc__.title(), "<b>Can not verify the update."
+                "</b><br>{}".format(reason))
+        return Downloader(self, checksum=checksum)
 
     def _set_guimode(self):
         """Switch between simple and full UX."""
         for widget in (self.group0, self.group2, self.group3, self.group4,
-                       self.group5, self.statusBar(), self.menuBar()):
+                       self.group5, self.group6, self.statusBar(),
+                       self.menuBar()):
             widget.hide() if self.guimode.currentIndex() else widget.show()
         self.resize(self.minimumSize()
                     if self.guimode.currentIndex() else self.maximumSize())
@@ -523,17 +5486,24 @@ class MainWindow(QMainWindow):
         >>> isinstance(MainWindow().get_half_of_resolution(), tuple)
         True
         """
-        mouse_pointer_position = QApplication.desktop().cursor().pos()
-        screen = QApplication.desktop().screenNumber(mouse_pointer_position)
-        widt = QApplication.desktop().screenGeometry(screen).size().width() / 2
-        hei = QApplication.desktop().screenGeometry(screen).size().height() / 2
-        return (int(widt), int(hei))
+        with TRACER.span("half of resolution"):
+            mouse_pointer_position = QApplication.desktop().cursor().pos()
+            screen = QApplication.desktop().screenNumber(
+                mouse_pointer_position)
+            size = QApplication.desktop().screenGeometry(screen).size()
+            return (int(size.width() / 2), int(size.height() / 2))
 
     def closeEvent(self, event):
-        """Ask to Quit."""
+        """Ask to Quit,when resident on the tray just hide."""
+        if self.tray:
+            self.hide()
+            return event.ignore()
         the_conditional_is_true = QMessageBox.question(
             self, __doc__.title(), 'Quit ?.', QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No) == QMessageBox.Yes
+        if the_conditional_is_true:
+            self.stop_instances()
+            self.stop_throttle()
         event.accept() if the_conditional_is_true else event.ignore()
 
 
@@ -543,44 +5513,17 @@ class MainWindow(QMainWindow):
 def main():
     """Main Loop."""
     APPNAME = str(__package__ or __doc__)[:99].lower().strip().replace(" ", "")
-    if not sys.platform.startswith("win") and sys.stderr.isatty():
-        def add_color_emit_ansi(fn):
-            """Add methods we need to the class."""
-            def new(*args):
-                """Method overload."""
-                if len(args) == 2:
-                    new_args = (args[0], copy(args[1]))
-                else:
-                    new_args = (args[0], copy(args[1]), args[2:])
-                if hasattr(args[0], 'baseFilename'):
-                    return fn(*args)
-                levelno = new_args[1].levelno
-                if levelno >= 50:
-                    color = '\x1b[31m'  # red
-                elif levelno >= 40:
-                    color = '\x1b[31m'  # red
-                elif levelno >= 30:
-                    color = '\x1b[33m'  # yellow
-                elif levelno >= 20:
-                    color = '\x1b[32m'  # green
-                elif levelno >= 10:
-                    color = '\x1b[35m'  # pink
-                else:
-                    color = '\x1b[0m'  # normal
-                try:
-                    new_args[1].msg = color + str(new_args[1].msg) + '\x1b[0m'
-                except Exception as reason:
-                    print(reason)  # Do not use log here.
-                return fn(*new_args)
-            return new
-        # all non-Windows platforms support ANSI Colors so we use them
-        log.StreamHandler.emit = add_color_emit_ansi(log.StreamHandler.emit)
-    log.basicConfig(
-        level=-1, format="%(levelname)s:%(asctime)s %(message)s", filemode="w",
-        filename=os.path.join(gettempdir(), "bge-launcher.log"))
-    log.getLogger().addHandler(log.StreamHandler(sys.stderr))
     try:
-        os.nice(19)  # smooth cpu priority
+        opts = dict(getopt(sys.argv[1:], 'hvtp', (
+            'version', 'help', 'tests', 'perf', 'log-level=', 'log-json',
+            'trace=', 'resident'))[0])
+    except GetoptError as reason:
+        return sys.exit(reason)
+    atexit.register(setup_logging(
+        opts.get("--log-level", "DEBUG").upper(), os.path.splitext(
+            LOG_FILE)[0] + ".jsonl" if "--log-json" in opts else LOG_FILE,
+        "--log-json" in opts).stop)
+    try:  # No os.nice(19),the Game would inherit it,see PRIORITY_PROFILES
         libc = cdll.LoadLibrary('libc.so.6')  # set process name
         buff = create_string_buffer(len(APPNAME) + 1)
         buff.value = bytes(APPNAME.encode("utf-8"))
@@ -588,21 +5531,51 @@ def main():
     except Exception as reason:
         log.warning(reason)
     signal.signal(signal.SIGINT, signal.SIG_DFL)  # CTRL+C work to quit app
-    application = QApplication(sys.argv)
+    with TRACER.span("qapplication"):
+        application = QApplication(sys.argv)
     application.setApplicationName(__doc__.strip().lower())
     application.setOrganizationName(__doc__.strip().lower())
     application.setOrganizationDomain(__doc__.strip())
     application.setWindowIcon(QIcon.fromTheme("blender"))
-    try:
-        opts, args = getopt(sys.argv[1:], 'hvt', ('version', 'help', 'tests'))
-    except:
-        pass
-    for o, v in opts:
+    for o in opts:
         if o in ('-h', '--help'):
             print(APPNAME + ''' Usage:
                   -h, --help        Show help informations and exit.
                   -v, --version     Show version information and exit.
-                  -t, --tests       Run Unit Tests on DocTests if any.''')
+                  -t, --tests       Run Unit Tests on DocTests if any.
+                  -p, --perf        Run performance Benchmarks and exit.
+                  --pack file.blend Pack a .blend into a {} Game and exit.
+                  --log-level level Log only this level and above,DEBUG.
+                  --log-json        Log JSON lines,bge-launcher.jsonl.
+                  --trace trace.json Trace startup and launch,Chrome trace
+                                    JSON and a summary on exit,any mode.
+                  --resident        Stay on the tray with warm caches,
+                                    launch Games requested by --client.
+                  --client profile.json [game] Launch on the resident
+                      --detach      launcher,print PID,exit with the Game.
+                                    Game can be a Game Library title.
+                  --launch profile.json [game] Run Game without GUI,exec it.
+                  --bench profile.json [game] Sweep settings,write a report.
+                      --matrix matrix.json  Settings to sweep,JSON lists.
+                      --duration seconds    Seconds to run each cell.
+                      --pinned              Run cells at once,one per core.
+                      --cold                Evict Game from cache each cell.
+                      --player command      Player to run,a stub for CI.
+                      --report name         Report name,without extension.
+                  --supervise profile.json [game] Run several instances,
+                      --instances instances.json  restart them on crash,
+                                            JSON list of options of each.
+                  --tune profile.json [game] Find the best quality settings
+                      --fps 60              that sustain this frame rate,
+                                            used on next launches of Game.
+                  --manifest game.blend Write the block hashes to publish
+                                        next to Game,for delta updates.
+                  --update url [game]   Update Game from the one published
+                                        at url,download changed blocks,
+                                        or all of it on segments if new.
+                  --library [folder...] Add folders to the Game Library,
+                                        rescan it and list its Games.'''
+                  .format(CONTAINER_EXT))
             return sys.exit(0)
         elif o in ('-v', '--version'):
             print(__version__)
@@ -611,8 +5584,22 @@ def main():
             from doctest import testmod
             testmod(verbose=True, report=True, exclude_empty=True)
             exit(0)
-    mainwindow = MainWindow()
-    mainwindow.show()
+        elif o in ('-p', '--perf'):
+            for benchmark in BENCHMARKS:
+                print(benchmark.__name__, benchmark())
+            return sys.exit(0)
+    started = time.perf_counter()
+    with TRACER.span("mainwindow"):
+        mainwindow = MainWindow()
+    if "--resident" in opts:
+        application.setQuitOnLastWindowClosed(False)
+        if not mainwindow.start_resident():
+            return sys.exit(1)
+    else:
+        with TRACER.span("mainwindow show"):
+            mainwindow.show()
+    log.info("Startup took {:.3f} Seconds until the MainWindow was shown."
+             .format(time.perf_counter() - started))
     sys.exit(application.exec_())
 
 